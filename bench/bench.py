@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Benchmarks for pod-tui's feed handling and rendering, run against generated feeds on a local HTTP server.
+
+    python bench/bench.py [--quick] [--latency MS] [--only fetch,global,filter,render] [--out FILE]
+
+Everything runs in a throwaway HOME with the app's HTTP traffic routed to the local server
+(POD_TUI_HTTP_BASE_URL), so the real caches, library and network are never touched. Results are
+one JSON document: per benchmark the sample count, latency percentiles in ms, throughput and the
+peak traced memory of one extra run under tracemalloc (kept apart so tracing doesn't skew timings).
+"""
+import argparse
+import email.utils
+import hashlib
+import http.server
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOSTS = 8 # Feeds are spread over this many fake hostnames so per-host limits behave as in the wild
+EPOCH = 1700000000
+
+def make_item(i, rng, seed):
+    """One <item>, rotating through the shapes real feeds use for enclosures, dates and durations."""
+    url = f"https://cdn{i % 3}.example.com/{seed}/episode-{i}.mp3"
+    enclosure = [f'<enclosure url="{url}" length="{rng.randrange(10**6, 10**8)}" type="audio/mpeg"/>',
+                 f'<media:content url="{url}?source=rss" type="audio/mpeg"/>', # media:content only
+                 f'<link>{url}</link>', # Audio file only as the item link
+                 f'<enclosure url="https://dts.example.net/redirect/{seed}/{i}" type="audio/x-m4a"/><enclosure url="https://example.com/cover-{i}.jpg" type="image/jpeg"/>'][i % 4]
+    stamp = EPOCH - i * 3600 * rng.randint(6, 48)
+    date = [email.utils.formatdate(stamp, usegmt=True), email.utils.formatdate(stamp, localtime=False).replace("-0000", "+0200"),
+            "", time.strftime("%Y-%m-%d", time.gmtime(stamp))][i % 7 % 4] # RFC 822 GMT, numeric offset, missing, not RFC 822
+    duration = [f"{rng.randint(0, 2)}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}", str(rng.randint(60, 7200)), "45:10"][i % 3]
+    words = " ".join(rng.choice(("market", "history", "science", "interview", "weekly", "news", "deep", "dive")) for _ in range(40))
+    summary = f"&lt;p&gt;Episode {i}: {words} &amp;amp; more &lt;a href=&quot;https://example.com/{i}&quot;&gt;notes&lt;/a&gt;&lt;/p&gt;"
+    body = f"<description>{summary}</description>" if i % 5 else f"<content:encoded><![CDATA[<p>Episode {i}: {words}</p><ul><li>one</li></ul>]]></content:encoded>"
+    return (f"<item><title>Episode {i}: {words[:30]}</title>{enclosure}"
+            + (f"<pubDate>{date}</pubDate>" if date else "") + f"<itunes:duration>{duration}</itunes:duration>{body}</item>")
+
+def make_rss(size, seed=0):
+    rng = random.Random(seed * 100003 + size); items = "".join(make_item(i, rng, seed) for i in range(size))
+    return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd" '
+            'xmlns:media="http://search.yahoo.com/mrss/" xmlns:content="http://purl.org/rss/1.0/modules/content/">'
+            f"<channel><title>Bench {size}</title>{items}</channel></rss>").encode()
+
+def make_atom(size, seed=0):
+    # Not RSS: exercises the feedparser fallback
+    entries = "".join(f'<entry><title>Entry {i}</title><id>urn:{seed}:{i}</id><updated>{time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(EPOCH - i * 86400))}</updated>'
+                      f'<link rel="enclosure" type="audio/mpeg" href="https://example.com/atom/{seed}/{i}.mp3"/><summary>Atom entry {i}</summary></entry>' for i in range(size))
+    return f'<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom"><title>Atom {size}</title>{entries}</feed>'.encode()
+
+class FeedServer:
+    """Serves /<host>/feed/<size>?kind=rss|atom&seed=N with ETag revalidation, after `latency` seconds per request."""
+    def __init__(self, latency=0.0):
+        self.latency = latency; self.bodies = {}; self.requests = 0; self.lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True # Headers and body go out in separate writes; don't let delayed ACKs add 40 ms
+            def log_message(self, *args): pass
+            def do_GET(self):
+                with server.lock: server.requests += 1
+                if server.latency: time.sleep(server.latency)
+                body, etag = server.body(self.path)
+                if body is None: self.send_response(404); self.send_header("Content-Length", "0"); self.end_headers(); return
+                if self.headers.get("If-None-Match") == etag: self.send_response(304); self.send_header("ETag", etag); self.end_headers(); return
+                self.send_response(200); self.send_header("Content-Type", "application/rss+xml"); self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body))); self.end_headers(); self.wfile.write(body)
+
+        class Server(http.server.ThreadingHTTPServer):
+            daemon_threads = True
+            def handle_error(self, request, client_address):
+                if not isinstance(sys.exc_info()[1], ConnectionError): super().handle_error(request, client_address) # Clients dropping keep-alive connections
+
+        self.httpd = Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def body(self, path):
+        path, _, query = path.partition("?"); parts = path.strip("/").split("/")
+        if len(parts) < 3 or parts[1] != "feed": return None, None
+        args = dict(p.split("=", 1) for p in query.split("&") if "=" in p)
+        key = (int(parts[2]), args.get("kind", "rss"), int(args.get("seed", 0)))
+        with self.lock:
+            if key not in self.bodies:
+                body = (make_atom if key[1] == "atom" else make_rss)(key[0], key[2])
+                self.bodies[key] = (body, '"%s"' % hashlib.sha1(body).hexdigest()[:16])
+            return self.bodies[key]
+
+    def prepare(self, url):
+        # Generating a 10k item feed takes longer than serving it; do it before the clock starts
+        parts = urlparse(url); self.body(f"/{parts.netloc}{parts.path}?{parts.query}")
+
+    def close(self): self.httpd.shutdown()
+
+class FakeMpv:
+    """Just enough of mpv's JSON IPC: replies to every request_id, sends property-change for observed properties."""
+    def __init__(self, path):
+        self.path = path; self.clients = []; self.props = {"time-pos": 0.0, "duration": 3600.0, "pause": False, "path": None}
+        if os.path.exists(path): os.remove(path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM); self.sock.bind(path); self.sock.listen(4)
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try: conn, _ = self.sock.accept()
+            except OSError: return
+            self.clients.append(conn); threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        for line in conn.makefile("rb"):
+            msg = json.loads(line); cmd = msg.get("command", [])
+            reply = {"request_id": msg.get("request_id", 0), "error": "success", "data": self.props.get(cmd[1]) if cmd and cmd[0] == "get_property" else None}
+            out = [reply]
+            if cmd and cmd[0] == "observe_property": out.append({"event": "property-change", "id": cmd[1], "name": cmd[2], "data": self.props.get(cmd[2])})
+            conn.sendall("".join(json.dumps(m) + "\n" for m in out).encode())
+
+    def push(self, name, value):
+        self.props[name] = value; data = (json.dumps({"event": "property-change", "name": name, "data": value}) + "\n").encode()
+        for conn in list(self.clients):
+            try: conn.sendall(data)
+            except OSError: self.clients.remove(conn)
+
+    def close(self): self.sock.close()
+
+def load_app(home, base_url):
+    # The app resolves its cache and config paths at import time, so HOME has to be in place first
+    os.environ["HOME"] = home; os.environ["POD_TUI_HTTP_BASE_URL"] = base_url; os.environ.setdefault("POD_TUI_HTTP_RETRIES", "0")
+    spec = importlib.util.spec_from_file_location("pod_tui", os.path.join(ROOT, "pod-tui.py"))
+    module = importlib.util.module_from_spec(spec); sys.modules["pod_tui"] = module; spec.loader.exec_module(module)
+    return module
+
+def percentile(sorted_samples, p):
+    return sorted_samples[min(len(sorted_samples) - 1, max(0, int(round(p / 100 * len(sorted_samples) + 0.5)) - 1))]
+
+def result(name, samples, work=None, unit=None, peak=None, **extra):
+    """`samples` are seconds per operation; `work` is how many `unit`s one operation handles, for throughput."""
+    s = sorted(samples); total = sum(s); ms = lambda v: round(v * 1000, 3)
+    out = {"name": name, "n": len(s), "mean_ms": ms(total / len(s)), "p50_ms": ms(percentile(s, 50)), "p90_ms": ms(percentile(s, 90)),
+           "p99_ms": ms(percentile(s, 99)), "max_ms": ms(s[-1])}
+    if work: out["throughput"] = round(work * len(s) / total, 1) if total else None; out["unit"] = f"{unit}/s"
+    if peak is not None: out["peak_kib"] = round(peak / 1024, 1)
+    out.update(extra); return out
+
+def timed(fn, repeat):
+    samples = []
+    for i in range(repeat):
+        t = time.perf_counter(); fn(i); samples.append(time.perf_counter() - t)
+    return samples
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try: fn(-1); return tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+
+def new_player(pod, tmp, tag):
+    # Fresh caches and library per scenario so cold runs really are cold
+    player = pod.PodcastPlayer(interactive=False)
+    player.feed_cache = pod.FeedCache(os.path.join(tmp, f"feeds-{tag}")); player.store = pod.EpisodeStore(os.path.join(tmp, f"library-{tag}.db"))
+    player.refresh_attempts.clear(); player.refresh_failures.clear() # Saved by the previous scenario's refresh
+    return player
+
+def feed_url(size, n, kind="rss", seed=0):
+    return f"http://feeds{n % HOSTS}.bench/feed/{size}?kind={kind}&seed={seed}&n={n}"
+
+def bench_fetch(pod, server, tmp, sizes, repeat):
+    results = []; player = new_player(pod, tmp, "fetch")
+    # Untimed: the first request pays for importing requests and opening the session
+    warmup = {'name': "warmup", 'feed_url': feed_url(10, 0, seed=-2)}; server.prepare(warmup['feed_url']); player.fetch_single_feed(warmup)
+    for kind in ("rss", "atom"):
+        for size in sizes if kind == "rss" else sizes[:2]:
+            reps = max(3, repeat // max(1, size // 1000)) # Fewer rounds for the big feeds
+            # Every round (and the tracemalloc one, i = -1) gets its own feed: a cold fetch that downloads, parses and stores it all
+            pods = {i: {'name': f"{kind}-{size}-{i}", 'feed_url': feed_url(size, i, kind, seed=i)} for i in range(-1, reps)}
+            for p in pods.values(): server.prepare(p['feed_url'])
+            def cold(i): assert player.fetch_single_feed(pods[i], limit=size)
+            samples = timed(cold, reps); peak = peak_memory(cold)
+            results.append(result(f"fetch.cold.{kind}.{size}", samples, size, "items", peak, items=size))
+            # The same feeds again once their cache is stale: one conditional GET answered with 304 each
+            def revalidate(i):
+                entry = player.feed_cache.entries[pods[i]['feed_url']]; entry['checked'] = 0
+                player.fetch_single_feed(pods[i], limit=size)
+            results.append(result(f"fetch.revalidate.{kind}.{size}", timed(revalidate, reps), size, "items", peak_memory(revalidate), items=size))
+    return results
+
+def bench_global(pod, server, tmp, subscriptions, items):
+    results = []
+    for n in range(subscriptions): server.prepare(feed_url(items, n, seed=n))
+    def refresh(player):
+        player.current_fetch_id += 1; player.async_fetch_episodes({'type': 'global', 'name': '--- NEW EPISODES ---'}, player.current_fetch_id)
+        return player.episodes
+    def make(tag):
+        player = new_player(pod, tmp, tag)
+        player.subscriptions = [{'name': f"Show {n}", 'feed_url': feed_url(items, n, seed=n)} for n in range(subscriptions)]; player.update_podcast_list()
+        return player
+    cold = []; warm = []; revalidate = []
+    for r in range(3):
+        player = make(f"global-{r}")
+        t = time.perf_counter(); eps = refresh(player); cold.append(time.perf_counter() - t)
+        assert eps, "global refresh returned no episodes"
+        # Nothing is due right after a refresh: NEW EPISODES is answered by the library alone
+        t = time.perf_counter(); refresh(player); warm.append(time.perf_counter() - t)
+        for entry in player.feed_cache.entries.values(): entry['checked'] = 0
+        player.refresh_attempts.clear()
+        t = time.perf_counter(); refresh(player); revalidate.append(time.perf_counter() - t)
+    peak = peak_memory(lambda _: refresh(make("global-peak")))
+    meta = {'subscriptions': subscriptions, 'items_per_feed': items}
+    results.append(result("global.cold", cold, subscriptions, "feeds", peak, **meta))
+    results.append(result("global.warm", warm, subscriptions, "feeds", **meta))
+    results.append(result("global.revalidate", revalidate, subscriptions, "feeds", **meta))
+    return results
+
+def bench_filter(pod, tmp, size):
+    results = []
+    data = make_rss(size); parse = lambda: pod.parse_rss_stream(io.BytesIO(data), "Bench", size)
+    episodes = parse(); query = "episode 12 market"
+    first = lambda eps: pod.SearchIndex(eps, lambda e: f"{e.title}\n{e.description}").filter(query[0])
+    firsts = []
+    for _ in range(10):
+        # A fresh list each round: descriptions are cleaned on first read, and a real first keystroke pays for that
+        fresh = parse(); t = time.perf_counter(); first(fresh); firsts.append(time.perf_counter() - t)
+    fresh = parse()
+    results.append(result("filter.first_keystroke", firsts, size, "episodes", peak_memory(lambda _: first(fresh)), episodes=size))
+    keystrokes = []
+    for _ in range(10):
+        index = pod.SearchIndex(episodes, lambda e: f"{e.title}\n{e.description}"); index.filter(query[0])
+        for n in range(2, len(query) + 1):
+            t = time.perf_counter(); index.filter(query[:n]); keystrokes.append(time.perf_counter() - t)
+    results.append(result("filter.keystroke", keystrokes, size, "episodes", episodes=size))
+    store = pod.EpisodeStore(os.path.join(tmp, "library-filter.db"))
+    feeds = [f"feed-{n}" for n in range(0, size, 1000)]
+    for n, feed in zip(range(0, size, 1000), feeds): store.upsert(feed, {'name': f"Show {n}"}, episodes[n:n + 1000])
+    for q in ("market", "interview weekly", "episode 12"):
+        results.append(result(f"filter.library.{q.replace(' ', '_')}", timed(lambda _: store.search(q, feeds), 20), size, "episodes", episodes=size))
+    return results
+
+def bench_render(pod, tmp, size, frames):
+    from rich.console import Console
+    mpv = FakeMpv(os.path.join(tmp, "mpv.sock"))
+    player = new_player(pod, tmp, "render"); player.select_podcast = lambda *args: None # Selection fetches are covered elsewhere
+    player.history = pod.HistoryStore(os.path.join(tmp, "history.json"), os.path.join(tmp, "history.journal")) # Headless players have none
+    player.mpv = pod.MpvClient(mpv.path, on_change=player.request_redraw, stats=player.stats)
+    player.console = Console(file=io.StringIO(), width=160, height=50, force_terminal=True, color_system="truecolor")
+    player.subscriptions = [{'name': f"Show {n}", 'feed_url': feed_url(10, n)} for n in range(40)]; player.update_podcast_list()
+    layout = player.create_layout(); player.active_pane = 'episodes'; player.update_layout(layout)
+    player.episodes = pod.parse_rss_stream(io.BytesIO(make_rss(size)), "Bench", size); player.update_layout(layout)
+    paint = lambda: (player.console.file.seek(0), player.console.file.truncate(), player.console.print(layout))
+    def idle(_): player.update_layout(layout)
+    def scroll(i):
+        player.selected_episode_index = (player.selected_episode_index + 1) % size; player.update_layout(layout); paint()
+    results = [result("render.idle", timed(idle, frames * 10), 1, "frames", peak_memory(idle)),
+               result("render.scroll", timed(scroll, frames), 1, "frames", peak_memory(scroll), episodes=size)]
+    player.playing_episode = player.episodes[0]; player.mpv.connect(); player.update_layout(layout)
+    def tick(i):
+        # One second of playback as mpv reports it: a property-change event, then the frame it causes
+        player.redraw.clear(); mpv.push("time-pos", float(i + 2)); player.redraw.wait(1)
+        t = time.perf_counter(); player.update_layout(layout); paint()
+        if i >= 0: ticks.append(time.perf_counter() - t)
+    ticks = []; events = timed(tick, frames)
+    results.append(result("render.playback_tick", ticks, 1, "frames", peak_memory(tick)))
+    results.append(result("render.mpv_event_to_frame", events, 1, "frames"))
+    rtt = timed(lambda _: player.mpv.command(["get_property", "volume"], wait=True), frames)
+    results.append(result("mpv.rtt", rtt, 1, "commands"))
+    player.mpv.close(); mpv.close(); player.history.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="smaller feeds and fewer rounds, for a quick check")
+    parser.add_argument("--latency", type=float, default=20.0, help="milliseconds the feed server waits before each response (default 20)")
+    parser.add_argument("--only", default="fetch,global,filter,render", help="comma separated benchmark groups")
+    parser.add_argument("--out", help="also write the JSON here")
+    args = parser.parse_args()
+    groups = set(args.only.split(","))
+    server = FeedServer(args.latency / 1000)
+    with tempfile.TemporaryDirectory(prefix="pod-tui-bench-") as tmp:
+        pod = load_app(tmp, server.base_url); results = []
+        sizes = [10, 100, 1000] if args.quick else [10, 100, 1000, 10000]
+        started = time.perf_counter()
+        if "fetch" in groups: results += bench_fetch(pod, server, tmp, sizes, 5 if args.quick else 20)
+        if "global" in groups: results += bench_global(pod, server, tmp, 40 if args.quick else 200, 50)
+        if "filter" in groups: results += bench_filter(pod, tmp, 2000 if args.quick else 10000)
+        if "render" in groups: results += bench_render(pod, tmp, 500, 20 if args.quick else 100)
+    report = {"meta": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(), "latency_ms": args.latency,
+                       "quick": args.quick, "requests_served": server.requests, "seconds": round(time.perf_counter() - started, 1)},
+              "results": results}
+    server.close()
+    text = json.dumps(report, indent=1)
+    if args.out:
+        with open(args.out, "w") as f: f.write(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
-import requests
+import time
+STARTED_AT = time.perf_counter()
 import sys
 import subprocess
-import time
 import threading
 from rich.console import Console
 from rich.layout import Layout
@@ -20,9 +20,22 @@ import termios
 import os
 import logging
 import re
-from datetime import datetime
+from datetime import datetime, timezone
 import unicodedata
-import feedparser
+import hashlib
+import calendar
+import contextlib
+import math
+import sqlite3
+import queue
+import io
+import signal
+import html
+import email.utils
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeout, as_completed
+from urllib.parse import urlparse, quote
 
 # Configure logging
 LOG_DIR = os.path.expanduser("~/.cache/pod-tui")
@@ -33,16 +46,62 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 MPV_LOG = os.path.join(LOG_DIR, "mpv.log")
+FEED_CACHE_DIR = os.path.join(LOG_DIR, "feeds")
+FEED_FRESH_SECONDS = 300 # Serve cached feeds without revalidating for this long
+LIBRARY_DB = os.path.join(LOG_DIR, "library.db")
+LIBRARY_LIMIT = 500 # Rows NEW EPISODES and library searches show
+ITUNES_CACHE_FILE = os.path.join(LOG_DIR, "itunes.json")
+ITUNES_CACHE_TTL = 7 * 86400 # Feed URLs rarely move; re-resolve weekly
+ITUNES_LOOKUP_BATCH = 100 # Ids per lookup request
+HTTP_USER_AGENT = "Mozilla/5.0"
+HTTP_TIMEOUT = float(os.environ.get("POD_TUI_HTTP_TIMEOUT", "10")) # Seconds, connect and read
+HTTP_RETRIES = int(os.environ.get("POD_TUI_HTTP_RETRIES", "2")) # Retries on connection errors and 429/5xx, exponential backoff
+HTTP_POOL_SIZE = int(os.environ.get("POD_TUI_HTTP_POOL_SIZE", "4")) # Keep-alive connections kept per host
+# Route every request to a local stand-in server: https://host/path becomes <base>/host/path
+HTTP_BASE_URL = os.environ.get("POD_TUI_HTTP_BASE_URL", "")
+ITUNES_API = "https://itunes.apple.com"
+# Background refresh: each subscription is polled at a quarter of its publish cadence, never faster than the
+# server's Cache-Control allows, doubled per consecutive failure and clamped to [REFRESH_MIN, REFRESH_MAX]
+REFRESH_MIN = 30 * 60
+REFRESH_MAX = 24 * 3600
+REFRESH_SPACING = 2.0 # Seconds between two scheduled refreshes, keeps the scheduler from bursting
+SELECT_DEBOUNCE = 0.15 # The cursor has to rest this long before its episodes are fetched
+PREFETCH_NEIGHBOURS = 2 # Podcasts above and below the cursor warmed into the feed cache once it rests
+SEARCH_DEBOUNCE = 0.3 # Idle time after a keystroke before searching iTunes as you type
+SEARCH_MIN_CHARS = 3
+SEARCH_CACHE_SIZE = 64 # (term, entity) responses kept
+CHARTS_URL = "https://rss.applemarketingtools.com/api/v2/us/podcasts/top/50/podcasts.json"
+CLOCK_TICK = 1.0 # Longest the render loop sleeps without a redraw request (header clock resolution)
+FRAME_INTERVAL = 0.03 # Shortest gap between two pushed frames, coalesces bursts of redraw requests
+FETCH_WORKERS = int(os.environ.get("POD_TUI_FETCH_WORKERS", "8")) # Feeds fetched at once for NEW EPISODES
+FETCH_PER_HOST = int(os.environ.get("POD_TUI_FETCH_PER_HOST", "2")) # Concurrent requests against one feed host
+# Processes parsing feeds during bulk refreshes: "auto" = one per core, 0 = parse in the fetching thread
+PARSE_PROCESSES = os.environ.get("POD_TUI_PARSE_PROCESSES", "0")
+PARSE_WORKERS = (os.cpu_count() or 1) if PARSE_PROCESSES == "auto" else int(PARSE_PROCESSES)
+CLI_FETCH_WORKERS = int(os.environ.get("POD_TUI_CLI_WORKERS", "32")) # Feeds fetched at once by the headless commands
+DOWNLOAD_DIR = os.path.join(LOG_DIR, "episodes")
+DOWNLOAD_QUOTA = int(os.environ.get("POD_TUI_DOWNLOAD_QUOTA_MB", "2048")) * 1024 * 1024 # Least recently played files go first above this
+DOWNLOAD_WORKERS = int(os.environ.get("POD_TUI_DOWNLOAD_WORKERS", "3")) # Episodes downloaded at once
+AUTO_DOWNLOAD = int(os.environ.get("POD_TUI_AUTO_DOWNLOAD", "0")) # Newest episodes per subscription the scheduler keeps offline, 0 = off
 
 # Colors
 POD_BLUE = "#1D8AB9"
 LIGHT_TEXT = "#FFFFFF"
 GRAY_TEXT = "#B3B3B3"
 ERROR_RED = "#FF5555"
+DOWNLOAD_MARKS = {'done': "● ", 'active': "↓ "} # Episode row prefixes for offline copies
 
 MPV_SOCKET_PATH = f"/tmp/pod-tui-mpv-{os.getuid()}.sock"
+# One idle mpv serves the whole session; --prefetch-playlist pre-buffers the queued next episode
+MPV_CMD = ["mpv", "--no-video", "--no-terminal", "--idle=yes", "--prefetch-playlist=yes", f"--input-ipc-server={MPV_SOCKET_PATH}", "--user-agent=Mozilla/5.0", "--demuxer-max-bytes=50M", "--network-timeout=30", "--ytdl=no"]
 SUB_FILE = os.path.expanduser("~/.config/pod-tui/subscriptions.json")
 HISTORY_FILE = os.path.expanduser("~/.config/pod-tui/history.json")
+HISTORY_JOURNAL = HISTORY_FILE + ".journal" # Appended position updates since the last snapshot
+HISTORY_COMPACT_EVERY = 500 # Journal lines before they are folded into a new snapshot
+DISCOVERY_FILE = os.path.join(LOG_DIR, "discovery.json") # Last chart, drawn before the live refresh returns
+TTFF_TARGET = 0.3 # Seconds from process start to the first frame; slower starts are logged as warnings
+STATS_FILE = os.path.join(LOG_DIR, "stats.json") # Timing histograms of the last session, written on exit
+REFRESH_STATE_FILE = os.path.join(LOG_DIR, "refresh.json") # Last attempt and failure count per feed, so backoff survives restarts and cron runs
 
 # ASCII Block Font (5 lines)
 BIG_FONT = {
@@ -91,19 +150,611 @@ BIG_FONT = {
     '.': [" "," ", " ", " ", " ", "▄"],
 }
 
+EPISODE_FIELDS = ('title', 'url', 'published', 'date_text', 'duration', 'summary')
+AUDIO_EXTS = ['.mp3', '.m4a', '.aac', '.wav', '.ogg']
+ITUNES_NS = "{http://www.itunes.com/dtds/podcast-1.0.dtd}"
+MEDIA_NS = "{http://search.yahoo.com/mrss/}"
+CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}"
+
+def pick_audio_url(candidates):
+    for c in candidates:
+        if c and any(ext in c.lower() for ext in AUDIO_EXTS + ['podcast', 'audio', 'redirect']): return c
+    return candidates[0] if candidates else ""
+
+def parse_rss_date(value):
+    """(UTC timestamp, "") for an RFC 822 or ISO 8601 date, or (0, the text itself) when neither parses."""
+    try: dt = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try: dt = datetime.fromisoformat(value.strip().replace('Z', '+00:00')) # Plenty of feeds send 2024-05-01 or 2024-05-01T09:00:00Z
+        except (TypeError, ValueError): return 0, value[:16]
+    if not dt.tzinfo: dt = dt.replace(tzinfo=timezone.utc) # Same reading as feedparser's published_parsed
+    return dt.timestamp(), ""
+
+def clean_summary(summary):
+    return html.unescape(re.sub('<[^<]+?>', '', summary or '')).strip()
+
+class Episode:
+    """One episode. Slotted, with the podcast name interned so a feed's episodes share one string, a numeric UTC
+    publish time and the summary as the feed sent it; the HTML is only stripped when `description` is first read.
+    Library rows leave `summary` as None until the episode is shown."""
+    __slots__ = EPISODE_FIELDS + ('podcast_name', '_description')
+
+    def __init__(self, title, url, published=0, date_text="", duration='0', summary="", podcast_name=""):
+        self.title = title; self.url = url; self.published = published; self.date_text = date_text
+        self.duration = duration; self.summary = summary; self.podcast_name = sys.intern(podcast_name); self._description = None
+
+    @property
+    def date(self):
+        return time.strftime('%Y-%m-%d %H:%M', time.gmtime(self.published)) if self.published else self.date_text
+
+    @property
+    def description(self):
+        if self._description is None:
+            if self.summary is None: return ""
+            self._description = clean_summary(self.summary)
+        return self._description
+
+    def record(self):
+        return tuple(getattr(self, f) for f in EPISODE_FIELDS)
+
+def parse_rss_stream(stream, podcast_name, limit):
+    """Read RSS 2.0 items incrementally and stop once `limit` episodes are collected.
+    Returns None for documents that aren't plain RSS so the caller can fall back to feedparser."""
+    eps = []; context = ET.iterparse(stream, events=("start", "end")); root_seen = False
+    for event, elem in context:
+        if not root_seen:
+            if elem.tag != 'rss': return None
+            root_seen = True; continue
+        if event != 'end' or elem.tag != 'item': continue
+        candidates = []; link = elem.findtext('link') or ""
+        for enc in elem.iter('enclosure'):
+            if enc.get('url'): candidates.append(enc.get('url'))
+        candidates.extend(m.get('url') for m in elem.iter(f"{MEDIA_NS}content") if m.get('url'))
+        if any(ext in link.lower() for ext in AUDIO_EXTS): candidates.append(link)
+        audio_url = pick_audio_url(candidates)
+        if audio_url:
+            summary = elem.findtext('description') or elem.findtext(f"{ITUNES_NS}summary") or elem.findtext(f"{CONTENT_NS}encoded") or ""
+            published, date_text = parse_rss_date((elem.findtext('pubDate') or "").strip())
+            eps.append(Episode((elem.findtext('title') or 'Unknown').strip(), audio_url.strip(), published, date_text,
+                               (elem.findtext(f"{ITUNES_NS}duration") or '0').strip(), summary, podcast_name))
+        elem.clear()
+        if len(eps) >= limit: break
+    return eps
+
+def feed_entries_to_episodes(feed, podcast_name, limit):
+    eps = []
+    for entry in feed.entries[:limit]:
+        candidates = []
+        if 'enclosures' in entry: candidates.extend([e.get('href') for e in entry.enclosures if e.get('href')])
+        if 'links' in entry: candidates.extend([l.get('href') for l in entry.links if 'audio' in str(l.get('type', '')).lower() or l.get('rel') == 'enclosure'])
+        if 'media_content' in entry: candidates.extend([m.get('url') for m in entry.media_content if m.get('url')])
+        if 'links' in entry: candidates.extend([l.get('href') for l in entry.links if any(ext in str(l.get('href')).lower() for ext in AUDIO_EXTS)])
+        audio_url = pick_audio_url(candidates)
+        if not audio_url: continue
+        published = calendar.timegm(entry.published_parsed) if entry.get('published_parsed') else 0
+        eps.append(Episode(entry.get('title', 'Unknown'), audio_url, published, "" if published else entry.get('published', '')[:16],
+                           entry.get('itunes_duration', '0'), entry.get('summary', entry.get('description', '')), podcast_name))
+    return eps
+
+def parse_feed_bytes(content, headers, limit):
+    """Process pool entry point: parse a downloaded feed into Episode.record() tuples."""
+    eps = None
+    try: eps = parse_rss_stream(io.BytesIO(content), "", limit)
+    except ET.ParseError: pass
+    if eps is None:
+        import feedparser
+        eps = feed_entries_to_episodes(feedparser.parse(content, response_headers=headers), "", limit)
+    return [e.record() for e in eps]
+
+def cache_max_age(headers):
+    match = re.search(r'max-age=(\d+)', headers.get('Cache-Control', ''))
+    if match: return int(match.group(1))
+    try: return max(0, int(email.utils.parsedate_to_datetime(headers['Expires']).timestamp() - time.time()))
+    except: return 0
+
+class Histogram:
+    """Durations in half-octave buckets (each bound √2 times the last, from 1 µs up): constant memory however many
+    samples arrive, percentiles within one bucket."""
+    def __init__(self): self.buckets = {}; self.count = 0; self.total = 0.0; self.max = 0.0
+
+    def add(self, seconds):
+        i = max(0, int(2 * math.log2(max(seconds, 1e-6) * 1e6)))
+        self.buckets[i] = self.buckets.get(i, 0) + 1; self.count += 1; self.total += seconds; self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        rank = p / 100 * self.count; seen = 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen >= rank: return min(self.max, 2 ** ((i + 1) / 2) / 1e6)
+        return self.max
+
+    def summary(self):
+        ms = lambda v: round(v * 1000, 3)
+        return {'count': self.count, 'mean_ms': ms(self.total / self.count) if self.count else 0, 'p50_ms': ms(self.percentile(50)),
+                'p90_ms': ms(self.percentile(90)), 'p99_ms': ms(self.percentile(99)), 'max_ms': ms(self.max)}
+
+class Stats:
+    """Hot-path instrumentation: a Histogram per timed operation, plain counters for events, and the live threads."""
+    def __init__(self): self.histograms = {}; self.counters = {}; self.lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self.lock:
+            if name not in self.histograms: self.histograms[name] = Histogram()
+            self.histograms[name].add(seconds)
+
+    def count(self, name, n=1):
+        with self.lock: self.counters[name] = self.counters.get(name, 0) + n
+
+    def threads(self):
+        # Pool workers are numbered ("ThreadPoolExecutor-3_1"); group them by what's left of the name
+        groups = {}
+        for t in threading.enumerate():
+            key = re.sub(r'[-_]?\d+', '', t.name); groups[key] = groups.get(key, 0) + 1
+        return groups
+
+    def summary(self):
+        with self.lock:
+            timings = {name: h.summary() for name, h in sorted(self.histograms.items())}; counters = dict(sorted(self.counters.items()))
+        return {'timings': timings, 'counters': counters, 'threads': self.threads()}
+
+    def dump(self, path=STATS_FILE):
+        summary = self.summary()
+        for name, s in summary['timings'].items():
+            logging.info(f"stats {name}: n={s['count']} p50={s['p50_ms']}ms p90={s['p90_ms']}ms p99={s['p99_ms']}ms max={s['max_ms']}ms")
+        if summary['counters']: logging.info(f"stats counters: {summary['counters']}")
+        try:
+            with open(f"{path}.tmp", 'w') as f: json.dump(dict(summary, written=time.time()), f, indent=1)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e: logging.warning(f"Stats dump failed: {e}")
+
+class FetchCancelled(Exception):
+    pass
+
+class TeeReader:
+    """File-like wrapper that remembers what was read, so a failed streaming parse can hand the bytes to feedparser.
+    Reading stops with FetchCancelled as soon as `cancel()` turns true."""
+    def __init__(self, raw, cancel=None): self.raw = raw; self.cancel = cancel; self.chunks = []
+    def read(self, n=-1):
+        if self.cancel and self.cancel(): raise FetchCancelled()
+        chunk = self.raw.read(n); self.chunks.append(chunk); return chunk
+    def rest(self): return b"".join(self.chunks) + self.raw.read()
+
+class FeedCache:
+    """Parsed episode lists plus HTTP validators (ETag / Last-Modified), one JSON file per feed URL.
+    On disk episodes are Episode.record() lists under the podcast's `name`; files in an older layout are ignored.
+    The check time, max-age and validators also go to a small sidecar file so a 304 doesn't rewrite the episodes."""
+    FORMAT = 2
+    META = ('checked', 'max_age', 'etag', 'modified')
+    def __init__(self, path=FEED_CACHE_DIR):
+        self.path = path; self.entries = {}; self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, url, suffix=".json"):
+        return os.path.join(self.path, hashlib.sha1(url.encode()).hexdigest() + suffix)
+
+    def _write(self, url, path, data):
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w') as f: json.dump(data, f)
+            os.replace(tmp, path)
+        except Exception as e: logging.warning(f"Feed cache write failed for {url}: {e}")
+
+    def get(self, url):
+        with self.lock:
+            if url in self.entries: return self.entries[url]
+        try:
+            with open(self._file(url), 'r') as f: entry = json.load(f)
+            if entry.get('format') != self.FORMAT: return None
+            entry['episodes'] = [Episode(*r, podcast_name=entry.get('name', "")) for r in entry['episodes']]
+        except: return None
+        try:
+            with open(self._file(url, ".meta.json"), 'r') as f: meta = json.load(f)
+            if meta.get('checked', 0) >= entry.get('checked', 0): entry.update((k, meta.get(k)) for k in self.META)
+        except: pass
+        with self.lock: return self.entries.setdefault(url, entry)
+
+    def put(self, url, entry):
+        entry['checked'] = time.time()
+        with self.lock: self.entries[url] = entry
+        self._write(url, self._file(url), dict(entry, format=self.FORMAT, episodes=[e.record() for e in entry['episodes']]))
+        self._write(url, self._file(url, ".meta.json"), {k: entry.get(k) for k in self.META})
+
+    def revalidated(self, url, entry):
+        """A 304: the episodes are unchanged, so only the sidecar is written."""
+        entry['checked'] = time.time()
+        with self.lock: self.entries[url] = entry
+        self._write(url, self._file(url, ".meta.json"), {k: entry.get(k) for k in self.META})
+
+class HttpClient:
+    """The one requests.Session every fetch goes through: pooled keep-alive connections, gzip, a default timeout and bounded retries."""
+    def __init__(self, base_url=HTTP_BASE_URL, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT, retries=HTTP_RETRIES):
+        self.base_url = base_url.rstrip('/'); self.timeout = timeout; self.pool_size = pool_size; self.retries = retries
+        self._session = None; self.lock = threading.Lock()
+
+    def session(self):
+        with self.lock:
+            if self._session is None:
+                # Deferred: importing requests takes longer than drawing the first frame
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                # Retry-After is ignored: urllib3 would sleep for whatever the server asks (hours, for some hosts) while holding a host slot
+                retry = Retry(total=self.retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset(["GET"]),
+                              raise_on_status=False, respect_retry_after_header=False)
+                adapter = HTTPAdapter(pool_connections=64, pool_maxsize=self.pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter); session.mount("https://", adapter)
+                session.headers.update({'User-Agent': HTTP_USER_AGENT, 'Accept-Encoding': 'gzip, deflate'})
+                self._session = session
+            return self._session
+
+    def url(self, url):
+        if not self.base_url: return url
+        parts = urlparse(url)
+        return f"{self.base_url}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session().get(self.url(url), **kwargs)
+
+class ItunesCache:
+    """itunes_id -> feed URL and description, persisted to disk and trusted for `ttl` seconds."""
+    def __init__(self, path=ITUNES_CACHE_FILE, ttl=ITUNES_CACHE_TTL):
+        self.path = path; self.ttl = ttl; self.lock = threading.Lock(); self.entries = {}
+        try:
+            with open(path, 'r') as f: self.entries = json.load(f)
+        except: pass
+
+    def get(self, itunes_id):
+        entry = self.entries.get(str(itunes_id))
+        return entry if entry and time.time() - entry.get('ts', 0) < self.ttl else None
+
+    def update(self, found):
+        with self.lock:
+            self.entries.update(found); snapshot = dict(self.entries)
+            tmp = f"{self.path}.tmp"
+            try:
+                with open(tmp, 'w') as f: json.dump(snapshot, f)
+                os.replace(tmp, self.path)
+            except Exception as e: logging.warning(f"iTunes cache write failed: {e}")
+
+class EpisodeStore:
+    """SQLite library of every fetched podcast and episode (WAL mode, one connection per thread), keyed by
+    enclosure URL, with an index on publish time and an FTS5 index over title and description.
+    `description` holds the raw summary; the FTS triggers index it through strip_html()."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS podcasts (feed_url TEXT PRIMARY KEY, name TEXT, artist TEXT, itunes_id TEXT);
+        CREATE TABLE IF NOT EXISTS episodes (url TEXT PRIMARY KEY, feed_url TEXT, podcast_name TEXT, title TEXT, description TEXT, date TEXT, published REAL, duration TEXT);
+        CREATE INDEX IF NOT EXISTS episodes_published ON episodes(published DESC);
+        CREATE INDEX IF NOT EXISTS episodes_feed ON episodes(feed_url, published DESC);
+    """
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS episodes_fts USING fts5(title, description, content='episodes', content_rowid='rowid');
+        CREATE TRIGGER IF NOT EXISTS episodes_ai AFTER INSERT ON episodes BEGIN
+            INSERT INTO episodes_fts(rowid, title, description) VALUES (new.rowid, new.title, strip_html(new.description)); END;
+        CREATE TRIGGER IF NOT EXISTS episodes_ad AFTER DELETE ON episodes BEGIN
+            INSERT INTO episodes_fts(episodes_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, strip_html(old.description)); END;
+        CREATE TRIGGER IF NOT EXISTS episodes_au AFTER UPDATE ON episodes BEGIN
+            INSERT INTO episodes_fts(episodes_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, strip_html(old.description));
+            INSERT INTO episodes_fts(rowid, title, description) VALUES (new.rowid, new.title, strip_html(new.description)); END;
+    """
+    # Libraries from before user_version was set indexed description verbatim; their FTS table is rebuilt through strip_html()
+    FTS_VERSION = 1
+    FTS_DROP = "DROP TRIGGER IF EXISTS episodes_ai; DROP TRIGGER IF EXISTS episodes_ad; DROP TRIGGER IF EXISTS episodes_au; DROP TABLE IF EXISTS episodes_fts;"
+    COLUMNS = "title, url, published, date, duration, podcast_name" # Summaries stay on disk until summary() asks
+
+    def __init__(self, path=LIBRARY_DB):
+        self.path = path; self.local = threading.local(); self.has_fts = True
+        self.db().executescript(self.SCHEMA)
+        try:
+            conn = self.db(); version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < self.FTS_VERSION: conn.executescript(self.FTS_DROP)
+            conn.executescript(self.FTS_SCHEMA)
+            if version < self.FTS_VERSION:
+                with conn:
+                    conn.execute("INSERT INTO episodes_fts(rowid, title, description) SELECT rowid, title, strip_html(description) FROM episodes")
+                    conn.execute(f"PRAGMA user_version={self.FTS_VERSION}")
+        except sqlite3.OperationalError as e: self.has_fts = False; logging.warning(f"SQLite without FTS5, library search falls back to LIKE: {e}")
+
+    def db(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL"); conn.execute("PRAGMA synchronous=NORMAL")
+            conn.create_function("strip_html", 1, clean_summary, deterministic=True)
+        return conn
+
+    def upsert(self, feed_url, pod, eps):
+        rows = [(e.url, feed_url, e.podcast_name, e.title, e.summary, e.date, e.published, e.duration) for e in eps]
+        with self.db() as conn:
+            conn.execute("INSERT INTO podcasts VALUES (?, ?, ?, ?) ON CONFLICT(feed_url) DO UPDATE SET name=excluded.name, artist=excluded.artist, itunes_id=excluded.itunes_id",
+                         (feed_url, pod.get('name'), pod.get('artist'), str(pod.get('itunes_id') or '')))
+            # Unchanged rows are skipped so re-fetching a feed doesn't churn the FTS index
+            conn.executemany("""INSERT INTO episodes VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(url) DO UPDATE SET
+                feed_url=excluded.feed_url, podcast_name=excluded.podcast_name, title=excluded.title, description=excluded.description,
+                date=excluded.date, published=excluded.published, duration=excluded.duration
+                WHERE title IS NOT excluded.title OR description IS NOT excluded.description OR date IS NOT excluded.date
+                    OR duration IS NOT excluded.duration OR podcast_name IS NOT excluded.podcast_name OR feed_url IS NOT excluded.feed_url""", rows)
+
+    def rows_to_episodes(self, rows):
+        return [Episode(r[0], r[1], r[2] or 0, "" if r[2] else r[3], r[4], None, r[5]) for r in rows]
+
+    def summary(self, url):
+        row = self.db().execute("SELECT description FROM episodes WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else ""
+
+    def latest(self, feed_urls, limit=LIBRARY_LIMIT):
+        if not feed_urls: return []
+        marks = ",".join("?" * len(feed_urls))
+        rows = self.db().execute(f"SELECT {self.COLUMNS} FROM episodes WHERE feed_url IN ({marks}) ORDER BY published DESC LIMIT ?", (*feed_urls, limit)).fetchall()
+        return self.rows_to_episodes(rows)
+
+    def search(self, query, feed_urls, limit=LIBRARY_LIMIT):
+        """Episodes of `feed_urls` containing every word of `query`, newest first. The FTS index matches word prefixes;
+        when that finds nothing the words are matched anywhere in the text, as the per-podcast filter does."""
+        terms = [t for t in re.split(r'\W+', query.lower()) if t]
+        if not terms or not feed_urls: return []
+        marks = ",".join("?" * len(feed_urls)); rows = []
+        if self.has_fts:
+            match = " ".join(f'"{t}"*' for t in terms) # Every word, as a prefix
+            sql = f"SELECT {self.COLUMNS} FROM episodes WHERE feed_url IN ({marks}) AND rowid IN (SELECT rowid FROM episodes_fts WHERE episodes_fts MATCH ?) ORDER BY published DESC LIMIT ?"
+            rows = self.db().execute(sql, (*feed_urls, match, limit)).fetchall()
+        if not rows:
+            where = " AND ".join("(title LIKE ? OR strip_html(description) LIKE ?)" for _ in terms)
+            args = [a for t in terms for a in (f"%{t}%", f"%{t}%")]
+            rows = self.db().execute(f"SELECT {self.COLUMNS} FROM episodes WHERE feed_url IN ({marks}) AND {where} ORDER BY published DESC LIMIT ?", (*feed_urls, *args, limit)).fetchall()
+        return self.rows_to_episodes(rows)
+
+class HistoryStore:
+    """Playback positions: an atomic JSON snapshot plus an append-only journal of updates since then.
+    A writer thread appends every update and periodically folds the journal into a fresh snapshot."""
+    def __init__(self, path=HISTORY_FILE, journal=HISTORY_JOURNAL):
+        self.path = path; self.journal = journal; self.positions = {}; self.queue = queue.Queue()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(path, 'r') as f: self.positions = json.load(f)
+        except: pass
+        self.pending = 0; self.torn = False
+        try:
+            with open(journal, 'r') as f:
+                for line in f:
+                    try: entry = json.loads(line); self.positions[entry['u']] = entry['p']; self.pending += 1
+                    except (ValueError, KeyError): self.torn = True # A torn last line from a crash mid-append
+        except OSError: pass
+        self.writer = threading.Thread(target=self._write_loop, daemon=True); self.writer.start()
+
+    def get(self, url, default=0):
+        return self.positions.get(url, default)
+
+    def record(self, url, pos):
+        self.positions[url] = pos; self.queue.put((url, pos))
+
+    def _write_loop(self):
+        with open(self.journal, 'a') as journal:
+            if self.torn: self.compact(journal) # Appending after a torn line would corrupt the next entry too
+            while True:
+                item = self.queue.get()
+                if item is None: break
+                journal.write(json.dumps({'u': item[0], 'p': item[1]}) + "\n"); journal.flush(); self.pending += 1
+                if self.pending >= HISTORY_COMPACT_EVERY: self.compact(journal)
+            if self.pending: self.compact(journal)
+
+    def compact(self, journal):
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, 'w') as f: json.dump(dict(self.positions), f); f.flush(); os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            journal.truncate(0); self.pending = 0 # Replaying a journal that survived a crash here is harmless
+        except OSError as e: logging.warning(f"History compaction failed: {e}")
+
+    def close(self):
+        self.queue.put(None); self.writer.join(timeout=2)
+
+class DownloadManager:
+    """Episode audio kept on disk for offline playback. A bounded pool downloads into `.part` files, resumed with
+    Range requests after a failure or restart; finished files are evicted least recently used first above `quota`."""
+    def __init__(self, http, path=DOWNLOAD_DIR, quota=DOWNLOAD_QUOTA, workers=DOWNLOAD_WORKERS, on_change=None):
+        self.http = http; self.path = path; self.quota = quota; self.on_change = on_change; self.running = True
+        self.pool = ThreadPoolExecutor(max_workers=workers); self.active = {}; self.evicted = set(); self.version = 0; self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.files = {n for n in os.listdir(path) if not n.endswith('.part')}
+
+    def _file(self, url):
+        ext = os.path.splitext(urlparse(url).path)[1].lower()
+        return os.path.join(self.path, hashlib.sha1(url.encode()).hexdigest() + (ext if ext in AUDIO_EXTS else ""))
+
+    def changed(self):
+        self.version += 1
+        if self.on_change: self.on_change()
+
+    def status(self, url):
+        """'done', 'active' or None."""
+        if url in self.active: return 'active'
+        return 'done' if os.path.basename(self._file(url)) in self.files else None
+
+    def local_path(self, url):
+        path = self._file(url)
+        if os.path.basename(path) not in self.files or not os.path.exists(path): return None
+        try: os.utime(path) # Playing counts as a use for the LRU
+        except OSError: pass
+        return path
+
+    def enqueue(self, url, auto=False):
+        with self.lock:
+            # An auto download evicted for space would only push out another one; leave it to the user
+            if not url or url in self.active or self.status(url) == 'done' or (auto and os.path.basename(self._file(url)) in self.evicted): return False
+            self.active[url] = 0.0
+        self.pool.submit(self._download, url); self.changed(); return True
+
+    def _download(self, url):
+        path = self._file(url); part = path + ".part"; offset = 0
+        try:
+            offset = os.path.getsize(part) if os.path.exists(part) else 0
+            while True:
+                # identity: byte offsets into a gzip-encoded body wouldn't line up with the file on disk
+                headers = {'Accept-Encoding': 'identity'}
+                if offset: headers['Range'] = f"bytes={offset}-"
+                with self.http.get(url, headers=headers, stream=True, timeout=30) as resp:
+                    if resp.status_code == 416 and offset:
+                        if resp.headers.get('Content-Range', '').endswith(f"/{offset}"): break # The .part already holds everything
+                        os.remove(part); offset = 0; continue # The file changed on the server; the .part can't be resumed
+                    resp.raise_for_status()
+                    if offset and resp.status_code != 206: offset = 0 # Range ignored, the body is the whole file
+                    total = offset + int(resp.headers.get('Content-Length') or 0)
+                    with open(part, 'ab' if offset else 'wb') as f:
+                        for chunk in resp.iter_content(256 * 1024):
+                            if not self.running: return
+                            f.write(chunk); offset += len(chunk)
+                            if total: self.active[url] = offset / total
+                break
+            os.replace(part, path)
+            with self.lock: self.files.add(os.path.basename(path)); self.evicted.discard(os.path.basename(path))
+            self.evict(keep=os.path.basename(path))
+        except Exception as e: logging.info(f"Download failed for {url}, keeping {offset} bytes to resume: {e}")
+        finally:
+            with self.lock: self.active.pop(url, None)
+            self.changed()
+
+    def evict(self, keep=None):
+        """Remove least recently used files until the directory fits the quota. Partial downloads count towards it."""
+        entries = []
+        for entry in os.scandir(self.path):
+            try: st = entry.stat(); entries.append((st.st_mtime, st.st_size, entry.name))
+            except OSError: pass
+        used = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if used <= self.quota: break
+            if name == keep or name.endswith('.part'): continue
+            try: os.remove(os.path.join(self.path, name)); used -= size
+            except OSError: continue
+            with self.lock: self.files.discard(name); self.evicted.add(name)
+        return used
+
+    def close(self):
+        self.running = False; self.pool.shutdown(wait=False, cancel_futures=True)
+
+class SearchIndex:
+    """Lowercased search text for one list. The last query's matches are kept so a growing query only narrows them."""
+    def __init__(self, items, text, keep=None):
+        self.items = items; self.keep = keep
+        self.texts = [text(item).lower() for item in items]
+        self.last = ("", range(len(items)), items)
+
+    def filter(self, query):
+        q = query.lower(); last_q, last_matches, last_result = self.last
+        if q == last_q: return last_result
+        candidates = last_matches if last_q and q.startswith(last_q) else range(len(self.items))
+        texts, items, keep = self.texts, self.items, self.keep
+        matches = [i for i in candidates if q in texts[i] or (keep and keep(items[i]))]
+        result = [items[i] for i in matches]
+        self.last = (q, matches, result) # One assignment, the render and input threads both filter
+        return result
+
+class MpvClient:
+    """One long-lived connection to mpv's JSON IPC socket. A reader thread keeps observed properties in `state`."""
+    OBSERVED = ("time-pos", "duration", "pause", "path")
+
+    def __init__(self, path=MPV_SOCKET_PATH, on_change=None, stats=None):
+        self.path = path; self.on_change = on_change; self.stats = stats; self.sock = None; self.state = {}; self.pending = {}; self.sent = {}
+        self.next_id = 0; self.last_attempt = 0; self.lock = threading.Lock()
+
+    def connect(self):
+        with self.lock:
+            if self.sock: return True
+            # Rendering asks every frame; don't hammer a socket that isn't there yet
+            if time.time() - self.last_attempt < 0.25 or not os.path.exists(self.path): return False
+            self.last_attempt = time.time()
+            try:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM); sock.settimeout(0.1); sock.connect(self.path); sock.settimeout(None)
+            except OSError: return False
+            self.sock = sock; self.state = {}
+        threading.Thread(target=self._reader, args=(sock,), daemon=True).start()
+        for i, prop in enumerate(self.OBSERVED, 1): self.command(["observe_property", i, prop])
+        return True
+
+    def close(self):
+        with self.lock: sock, self.sock = self.sock, None; self.state = {}
+        if sock:
+            try: sock.shutdown(socket.SHUT_RDWR); sock.close()
+            except OSError: pass
+
+    def _reader(self, sock):
+        buf = b""
+        try:
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk: break
+                buf += chunk
+                while b"\n" in buf:
+                    line, buf = buf.split(b"\n", 1)
+                    try: self._dispatch(json.loads(line))
+                    except ValueError: pass
+        except OSError: pass
+        with self.lock:
+            if self.sock is sock: self.sock = None; self.state = {}
+            waiters, self.pending = self.pending, {}; self.sent = {}
+        for event, _ in waiters.values(): event.set()
+
+    def _dispatch(self, msg):
+        if msg.get('event') == 'property-change':
+            self.state[msg.get('name')] = msg.get('data')
+            if self.on_change: self.on_change()
+        elif 'request_id' in msg:
+            with self.lock: waiter = self.pending.pop(msg['request_id'], None); sent = self.sent.pop(msg['request_id'], None)
+            if sent and self.stats: self.stats.add('mpv.rtt', time.perf_counter() - sent)
+            if waiter: waiter[1].update(msg); waiter[0].set()
+
+    def command(self, cmd, wait=False, timeout=1.0):
+        """Send a command; with wait=True block for the reply carrying the same request_id."""
+        if not self.connect(): return None
+        reply = {}
+        with self.lock:
+            if not self.sock: return None
+            self.next_id += 1; rid = self.next_id; event = threading.Event()
+            if wait: self.pending[rid] = (event, reply)
+            self.sent[rid] = time.perf_counter() # Every command gets a reply, waited for or not
+            try: self.sock.sendall((json.dumps({"command": cmd, "request_id": rid}) + "\n").encode())
+            except OSError: self.pending.pop(rid, None); self.sent.pop(rid, None); return None
+        if not wait: return None
+        if not event.wait(timeout):
+            with self.lock: self.pending.pop(rid, None); self.sent.pop(rid, None)
+            if self.stats: self.stats.count('mpv.timeout')
+            return None
+        return reply or None
+
+    def get(self, prop):
+        self.connect(); return self.state.get(prop)
+
 class PodcastPlayer:
-    def __init__(self):
+    def __init__(self, interactive=True):
         self.podcasts = []; self.episodes = []; self.subscriptions = []; self.discovery = []
         self.selected_podcast_index = 0; self.selected_episode_index = 0; self.active_pane = 'podcasts'
-        self.playing_episode = None; self.mpv_process = None; self.running = True
+        self.playing_episode = None; self.mpv_process = None; self.mpv_log = None; self.running = True
+        self.redraw = threading.Event(); self.pane_keys = {}; self.rendered_layout = None
+        self.stats = Stats(); self.show_stats = False; self.mpv = MpvClient(on_change=self.request_redraw, stats=self.stats)
+        self.play_list = []; self.queued_episode = None
         self.search_mode = False; self.search_buffer = ""
         self.current_position = 0.0; self.total_duration = 0.0
         self.console = Console(); self.load_subscriptions()
         self.is_fetching_episodes = False; self.loading_status = ""; self.last_index_for_fetch = -1; self.error_message = ""; self.error_time = 0
-        self.current_fetch_id = 0; self.is_showing_search = False
-        self.playback_history = self.load_history()
+        self.current_fetch_id = 0; self.pending_selection = None; self.selection_changed_at = 0; self.selection_cond = threading.Condition(); self.selection_thread = None
+        self.prefetch_pool = ThreadPoolExecutor(max_workers=2) # Small on purpose: prefetching must not compete with the selected feed
+        self.neighbourhood = set(); self.inflight = {}; self.inflight_lock = threading.Lock()
+        self.refresh_intervals = {}; self.refresh_attempts = {}; self.refresh_failures = {}; self.refresh_state_lock = threading.Lock(); self.load_refresh_state()
+        self.is_showing_search = False; self.discovery_chart = []
+        self.search_cache = OrderedDict(); self.search_lock = threading.Lock(); self.search_generation = 0; self.search_timer = None
+        self.history = HistoryStore() if interactive else None # Headless commands never open the journal, so they can't compact it under a session
+        self.podcast_index = None; self.episode_index = None; self.subscribed_names = set()
+        self.store = EpisodeStore(); self.selected_pod = None; self.library_query = ("", [])
+        self.http = HttpClient(); self.itunes_cache = ItunesCache(); self.feed_cache = FeedCache(); self.host_slots = {}; self.host_slots_lock = threading.Lock(); self.parse_pool = None; self.parse_pool_lock = threading.Lock()
+        self.downloads = DownloadManager(self.http, on_change=self.request_redraw); self.queued_source = None
         self.last_save_time = time.time()
-        self.fetch_discovery(); self.update_podcast_list()
+        # Headless commands only need subscriptions, caches and the fetch path
+        if not interactive: self.update_podcast_list(); return
+        # Draw from the last chart right away; the live one replaces it when it arrives
+        self.load_discovery_snapshot(); self.update_podcast_list()
+        if self.discovery: self.resolve_in_background(self.discovery)
+        threading.Thread(target=self.refresh_discovery, daemon=True).start()
         
         if os.path.exists(MPV_SOCKET_PATH):
             try: os.remove(MPV_SOCKET_PATH)
@@ -117,50 +768,158 @@ class PodcastPlayer:
         else: os.makedirs(os.path.dirname(SUB_FILE), exist_ok=True)
 
     def save_subscriptions(self):
+        # Atomic: a cron refresh may rewrite the file while a session reads it
+        tmp = f"{SUB_FILE}.{os.getpid()}.tmp"
         try:
-            with open(SUB_FILE, 'w') as f: json.dump(self.subscriptions, f)
+            with open(tmp, 'w') as f: json.dump(self.subscriptions, f)
+            os.replace(tmp, SUB_FILE)
         except: pass
 
-    def load_history(self):
-        if os.path.exists(HISTORY_FILE):
-            try:
-                with open(HISTORY_FILE, 'r') as f: return json.load(f)
-            except: pass
-        else: os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
-        return {}
-
-    def save_history(self):
+    def load_refresh_state(self):
         try:
-            with open(HISTORY_FILE, 'w') as f: json.dump(self.playback_history, f)
+            with open(REFRESH_STATE_FILE, 'r') as f: state = json.load(f)
+            self.refresh_attempts = state.get('attempts', {}); self.refresh_failures = state.get('failures', {})
         except: pass
 
+    def save_refresh_state(self):
+        keys = {s.get('feed_url') or s['name'] for s in self.subscriptions} # Unsubscribed feeds drop out
+        with self.refresh_state_lock:
+            state = {'attempts': {k: v for k, v in list(self.refresh_attempts.items()) if k in keys},
+                     'failures': {k: v for k, v in list(self.refresh_failures.items()) if k in keys}}
+            tmp = f"{REFRESH_STATE_FILE}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, 'w') as f: json.dump(state, f)
+                os.replace(tmp, REFRESH_STATE_FILE)
+            except: pass
+
     def set_error(self, msg):
-        self.error_message = msg; self.error_time = time.time()
+        self.error_message = msg; self.error_time = time.time(); self.request_redraw()
+
 
+    def load_discovery_snapshot(self):
+        try:
+            with open(DISCOVERY_FILE, 'r') as f: self.discovery = self.discovery_chart = json.load(f)
+        except: pass
 
     def fetch_discovery(self):
         try:
-            self.set_error("Updating discovery charts..."); self.is_showing_search = False
-            url = "https://rss.applemarketingtools.com/api/v2/us/podcasts/top/50/podcasts.json"
-            resp = requests.get(url, timeout=5); data = resp.json().get('feed', {}).get('results', [])
-            self.discovery = [{'name': r.get('name'), 'artist': r.get('artistName'), 'feed_url': "", 'itunes_id': r.get('id'), 'description': r.get('genres', [{}])[0].get('name', 'Podcast'), 'full_description': ""} for r in data]
-            self.set_error("")
+            self.set_error("Updating discovery charts...")
+            resp = self.http.get(CHARTS_URL, timeout=5); data = resp.json().get('feed', {}).get('results', [])
+            chart = [{'name': r.get('name'), 'artist': r.get('artistName'), 'feed_url': "", 'itunes_id': r.get('id'), 'description': r.get('genres', [{}])[0].get('name', 'Podcast'), 'full_description': ""} for r in data]
+            try:
+                with open(f"{DISCOVERY_FILE}.tmp", 'w') as f: json.dump(chart, f)
+                os.replace(f"{DISCOVERY_FILE}.tmp", DISCOVERY_FILE)
+            except: pass
+            # Search results on screen stay; the chart comes back on Esc
+            self.discovery_chart = chart
+            if not self.is_showing_search: self.discovery = chart
+            self.set_error(""); self.resolve_in_background(chart)
         except Exception as e:
             self.set_error(f"Discovery error: {str(e)}")
 
+    def refresh_discovery(self):
+        self.fetch_discovery(); self.update_podcast_list()
+
+    def restore_discovery(self):
+        # The chart snapshot is reused; only fetch when there never was one
+        self.is_showing_search = False
+        if self.discovery_chart: self.discovery = self.discovery_chart
+        else: threading.Thread(target=self.refresh_discovery, daemon=True).start()
+
+    def search_entity(self):
+        return "podcast" if self.active_pane == 'podcasts' else "podcastEpisode"
+
+    def itunes_search(self, term, entity):
+        key = (term.strip().lower(), entity)
+        with self.search_lock:
+            if key in self.search_cache: self.search_cache.move_to_end(key); return self.search_cache[key]
+        results = self.http.get(f"{ITUNES_API}/search?term={quote(term)}&entity={entity}&limit=50").json().get('results', [])
+        with self.search_lock:
+            self.search_cache[key] = results
+            while len(self.search_cache) > SEARCH_CACHE_SIZE: self.search_cache.popitem(last=False)
+        return results
+
+    def schedule_search(self):
+        # Every keystroke supersedes the pending query; the search starts once typing pauses
+        self.search_generation += 1
+        if self.search_timer: self.search_timer.cancel()
+        q = self.search_buffer
+        if len(q.strip()) < SEARCH_MIN_CHARS or q.startswith('http'): return
+        self.search_timer = threading.Timer(SEARCH_DEBOUNCE, self.run_search, args=(q, self.search_entity(), self.search_generation, False))
+        self.search_timer.daemon = True; self.search_timer.start()
+
+    def run_search(self, q, entity, generation, final=True):
+        """Background iTunes search. Results of superseded queries are dropped; as-you-type searches only
+        show podcast results live (episode results would replace the list being filtered) and warm the cache."""
+        if generation != self.search_generation: return
+        try:
+            if final: self.set_error(f"Searching iTunes for '{q}'...")
+            results = self.itunes_search(q, entity)
+        except Exception as e:
+            if final and generation == self.search_generation: self.set_error(f"Search error: {str(e)}")
+            return
+        if generation != self.search_generation: return
+        if not final:
+            if entity == "podcast" and self.search_mode and results: self.show_podcast_results(results, select=False)
+            return
+        if not results: self.set_error("No results found."); return
+        if entity == "podcast": self.show_podcast_results(results, select=True)
+        else:
+            found = []
+            for r in results:
+                date_str = r.get('releaseDate', '')
+                try: published = datetime.fromisoformat(date_str.replace('Z', '+00:00')).timestamp()
+                except ValueError: published = 0
+                found.append(Episode(r.get('trackName', 'Unknown'), r.get('episodeUrl', ''), published, "" if published else date_str[:16].replace('T', ' '),
+                                     str(r.get('trackTimeMillis', 0) // 1000), r.get('description', ''), r.get('collectionName', 'Unknown')))
+            self.episodes = found; self.selected_episode_index = 0
+        self.set_error("")
+
+    def show_podcast_results(self, results, select):
+        self.is_showing_search = True
+        self.discovery = [{'name': r.get('collectionName', 'Unknown'), 'artist': r.get('artistName', 'Unknown'), 'itunes_id': r.get('collectionId'), 'feed_url': r.get('feedUrl', ''), 'description': r.get('primaryGenreName', 'Podcast')} for r in results]
+        self.update_podcast_list()
+        if select:
+            for idx, p in enumerate(self.podcasts):
+                if p.get('type') == 'header' and 'DISCOVERY' in p.get('name', ''):
+                    self.selected_podcast_index = idx + 1; break
+        self.resolve_in_background(self.discovery)
+
     def get_visible_podcasts(self):
         if self.search_mode and self.search_buffer:
-            q = self.search_buffer.lower()
-            return [p for p in self.podcasts if q in p.get('name', '').lower() or q in p.get('artist', '').lower() or p.get('type') == 'header']
+            index = self.podcast_index
+            if not index or index.items is not self.podcasts:
+                # Live iTunes results already match the query server-side, so the local filter keeps them
+                live = {id(p) for p in self.discovery} if self.is_showing_search else set()
+                index = self.podcast_index = SearchIndex(self.podcasts, lambda p: f"{p.get('name') or ''}\n{p.get('artist') or ''}", keep=lambda p: p.get('type') == 'header' or id(p) in live)
+            return index.filter(self.search_buffer)
         return self.podcasts
 
+    def episode_search_index(self):
+        index = self.episode_index; episodes = self.episodes
+        if not index or index.items is not episodes:
+            index = self.episode_index = SearchIndex(episodes, lambda e: f"{e.title}\n{e.description}")
+        return index
+
+    def library_search(self, query):
+        # Same query, same list object: keeps the episodes pane key cheap between keystrokes
+        last_q, results = self.library_query
+        if query != last_q:
+            results = self.store.search(query, [s['feed_url'] for s in self.subscriptions if s.get('feed_url')]); self.library_query = (query, results)
+        return results
+
     def get_visible_episodes(self):
         if self.search_mode and self.search_buffer:
-            q = self.search_buffer.lower()
-            return [e for e in self.episodes if q in e.get('title', '').lower() or q in e.get('description', '').lower()]
+            # Filtering NEW EPISODES searches every subscription in the library, not just the rows on screen
+            if self.selected_pod and self.selected_pod.get('type') == 'global': return self.library_search(self.search_buffer)
+            return self.episode_search_index().filter(self.search_buffer)
         return self.episodes
 
-    def update_podcast_list(self):
+    def update_podcast_list(self, keep_selection=False):
+        """Rebuild the podcast pane: NEW EPISODES, subscriptions newest first, then discovery or search results.
+        With keep_selection the cursor follows the selected podcast when the rebuild moves it."""
+        visible = self.get_visible_podcasts() if keep_selection else []
+        selected = visible[self.selected_podcast_index] if self.selected_podcast_index < len(visible) else None
         new_list = []
         # Special entry for global feed
         if self.subscriptions:
@@ -172,73 +931,298 @@ class PodcastPlayer:
         discovery_label = "--- SEARCH RESULTS ---" if self.is_showing_search else "--- DISCOVERY ---"
         new_list.append({'type': 'header', 'name': discovery_label})
         new_list.extend(self.discovery)
+        self.subscribed_names = {s['name'] for s in self.subscriptions}
         self.podcasts = new_list
+        if selected is not None:
+            self.selected_podcast_index = next((i for i, p in enumerate(self.get_visible_podcasts()) if p is selected), self.selected_podcast_index)
+        self.request_redraw()
         if self.podcasts and self.podcasts[self.selected_podcast_index].get('type') == 'header':
             self.selected_podcast_index = min(len(self.podcasts)-1, self.selected_podcast_index + 1)
 
+    def apply_resolution(self, podcast, entry):
+        podcast['feed_url'] = entry['feed_url']; podcast['full_description'] = entry.get('description')
+
+    def lookup_itunes_ids(self, ids):
+        """Resolve iTunes ids with batched multi-id lookups; returns {id: entry} for every id that has a feed."""
+        found = {}
+        for i in range(0, len(ids), ITUNES_LOOKUP_BATCH):
+            chunk = ids[i:i + ITUNES_LOOKUP_BATCH]
+            try:
+                resp = self.http.get(f"{ITUNES_API}/lookup?id={','.join(chunk)}")
+                for r in resp.json().get('results', []):
+                    if r.get('feedUrl'): found[str(r.get('collectionId'))] = {'feed_url': r['feedUrl'], 'description': r.get('description'), 'ts': time.time()}
+            except Exception as e: logging.info(f"iTunes lookup failed for {len(chunk)} ids: {e}")
+        if found: self.itunes_cache.update(found)
+        return found
+
+    def resolve_podcasts(self, podcasts):
+        pending = []
+        for p in podcasts:
+            if p.get('feed_url') or not p.get('itunes_id'): continue
+            entry = self.itunes_cache.get(p['itunes_id'])
+            if entry: self.apply_resolution(p, entry)
+            else: pending.append(p)
+        if pending:
+            found = self.lookup_itunes_ids(list(dict.fromkeys(str(p['itunes_id']) for p in pending)))
+            for p in pending:
+                if str(p['itunes_id']) in found: self.apply_resolution(p, found[str(p['itunes_id'])])
+        self.request_redraw()
+
+    def resolve_in_background(self, podcasts):
+        # Resolve outward from the cursor so the rows about to be highlighted come back first
+        positions = {id(p): i for i, p in enumerate(self.podcasts)}
+        ordered = sorted(podcasts, key=lambda p: abs(positions.get(id(p), 0) - self.selected_podcast_index))
+        threading.Thread(target=self.resolve_podcasts, args=(ordered,), daemon=True).start()
+
     def resolve_podd_feed(self, podcast):
         if podcast.get('feed_url'): return podcast['feed_url']
         itunes_id = podcast.get('itunes_id')
+        if itunes_id:
+            entry = self.itunes_cache.get(itunes_id) or self.lookup_itunes_ids([str(itunes_id)]).get(str(itunes_id))
+            if entry: self.apply_resolution(podcast, entry); return podcast['feed_url']
+            return None
         try:
-            url = f"https://itunes.apple.com/lookup?id={itunes_id}" if itunes_id else f"https://itunes.apple.com/search?term={requests.utils.quote(podcast['name'])}&entity=podcast&limit=1"
-            resp = requests.get(url, timeout=5); results = resp.json().get('results', [])
+            url = f"{ITUNES_API}/search?term={quote(podcast['name'])}&entity=podcast&limit=1"
+            resp = self.http.get(url, timeout=5); results = resp.json().get('results', [])
             if results:
                 podcast['feed_url'] = results[0].get('feedUrl'); podcast['full_description'] = results[0].get('description')
                 return podcast['feed_url']
         except: pass
         return None
 
-    def fetch_single_feed(self, pod, limit=10):
+    @contextlib.contextmanager
+    def host_slot(self, url, cancel=None, prefetch=False):
+        """Hold one of the host's FETCH_PER_HOST request slots. Prefetches first take one of FETCH_PER_HOST - 1 prefetch
+        slots, so at least one is always left for the selection. Waiting stops as soon as `cancel` says so."""
+        host = urlparse(url).netloc
+        with self.host_slots_lock:
+            if host not in self.host_slots: self.host_slots[host] = (threading.BoundedSemaphore(FETCH_PER_HOST), threading.BoundedSemaphore(max(1, FETCH_PER_HOST - 1)))
+            slots, prefetch_slots = self.host_slots[host]
+        held = []
+        try:
+            for sem in ([prefetch_slots] if prefetch else []) + [slots]:
+                while not sem.acquire(timeout=0.1):
+                    if cancel and cancel(): raise FetchCancelled()
+                held.append(sem)
+            yield
+        finally:
+            for sem in reversed(held): sem.release()
+
+    def get_parse_pool(self):
+        if not PARSE_WORKERS or self.parse_pool: return self.parse_pool
+        with self.parse_pool_lock:
+            if not self.parse_pool:
+                # forkserver: forking the threaded UI process could copy a held lock into the worker
+                import multiprocessing # Both deferred: only bulk refreshes with POD_TUI_PARSE_PROCESSES set need them
+                from concurrent.futures import ProcessPoolExecutor
+                self.parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("forkserver"))
+            return self.parse_pool
+
+    def fetch_single_feed(self, pod, limit=10, parse_pool=None, cancel=None, prefetch=False):
         feed_url = self.resolve_podd_feed(pod)
         if not feed_url: return []
+        cached = self.feed_cache.get(feed_url)
+        # The cached list is only a valid answer if it was parsed with at least this many items
+        usable = cached is not None and cached.get('limit', 0) >= limit
+        if usable and time.time() - cached.get('checked', 0) < FEED_FRESH_SECONDS: return cached['episodes'][:limit]
+        # One request per feed at a time: the scheduler, NEW EPISODES, prefetches and the selection join whichever started first
+        with self.inflight_lock:
+            running = self.inflight.get(feed_url)
+            if not running or running[0] < limit: running = None; self.inflight[feed_url] = (limit, fut := Future())
+        if running:
+            while True:
+                try: eps = running[1].result(timeout=0.1); break
+                except FutureTimeout:
+                    if cancel and cancel(): self.stats.count('feed.cancelled'); return []
+            self.stats.count('feed.joined')
+            # None: the fetch we joined was cancelled by its own caller, so make the request after all
+            return eps[:limit] if eps is not None else self.fetch_single_feed(pod, limit, parse_pool, cancel, prefetch)
+        eps = None
+        try: eps = self.download_feed(feed_url, pod, cached, usable, limit, parse_pool, cancel, prefetch)
+        finally:
+            with self.inflight_lock:
+                if self.inflight.get(feed_url, (0, None))[1] is fut: del self.inflight[feed_url]
+            fut.set_result(eps)
+        return eps[:limit] if eps is not None else []
+
+    def download_feed(self, feed_url, pod, cached, usable, limit, parse_pool=None, cancel=None, prefetch=False):
+        """The network half of fetch_single_feed. Returns every parsed episode, the cache on failure, or None when cancelled."""
+        headers = {}
+        if usable:
+            if cached.get('etag'): headers['If-None-Match'] = cached['etag']
+            if cached.get('modified'): headers['If-Modified-Since'] = cached['modified']
+        stats = self.stats; started = time.perf_counter()
         try:
-            feed = feedparser.parse(feed_url); eps = []
-            for entry in feed.entries[:limit]:
-                audio_url = ""; candidates = []
-                if 'enclosures' in entry: candidates.extend([e.get('href') for e in entry.enclosures if e.get('href')])
-                if 'links' in entry: candidates.extend([l.get('href') for l in entry.links if 'audio' in str(l.get('type', '')).lower() or l.get('rel') == 'enclosure'])
-                if 'media_content' in entry: candidates.extend([m.get('url') for m in entry.media_content if m.get('url')])
-                if 'links' in entry: candidates.extend([l.get('href') for l in entry.links if any(ext in str(l.get('href')).lower() for ext in ['.mp3', '.m4a', '.aac', '.wav', '.ogg'])])
-                for c in candidates:
-                    if c and any(ext in c.lower() for ext in ['.mp3', '.m4a', '.aac', '.wav', '.ogg', 'podcast', 'audio', 'redirect']):
-                        audio_url = c; break
-                if not audio_url and candidates: audio_url = candidates[0]
-                if not audio_url: continue
-                date_str = time.strftime('%Y-%m-%d %H:%M', entry.published_parsed) if 'published_parsed' in entry else entry.get('published', '')[:16]
-                desc = re.sub('<[^<]+?>', '', entry.get('summary', entry.get('description', '')))
-                eps.append({'title': entry.get('title', 'Unknown'), 'description': desc, 'url': audio_url, 'date': date_str, 'duration': entry.get('itunes_duration', '0'), 'podcast_name': pod['name']})
+            parse_limit = max(limit, cached.get('limit', 0) if cached else 0)
+            with self.host_slot(feed_url, cancel, prefetch):
+                if cancel and cancel(): raise FetchCancelled()
+                t = time.perf_counter(); stats.add('feed.slot_wait', t - started)
+                with self.http.get(feed_url, headers=headers, timeout=15, stream=True) as resp:
+                    # requests times up to the parsed headers: DNS, connect and TLS on a new connection, then time to first byte
+                    stats.add('feed.headers', resp.elapsed.total_seconds())
+                    if resp.status_code == 304 and usable:
+                        cached['max_age'] = cache_max_age(resp.headers); stats.count('feed.not_modified')
+                        self.feed_cache.revalidated(feed_url, cached); return cached['episodes']
+                    resp.raise_for_status()
+                    t = time.perf_counter()
+                    if parse_pool: content = resp.content; resp_headers = {k.lower(): v for k, v in resp.headers.items()}; stats.add('feed.download', time.perf_counter() - t)
+                    else: eps = self.read_feed(resp, pod, parse_limit, cancel); stats.add('feed.stream', time.perf_counter() - t) # Download and parse interleave
+            if parse_pool:
+                if cancel and cancel(): raise FetchCancelled()
+                # Only the download holds the host slot; the parse runs on another core
+                t = time.perf_counter()
+                records = parse_pool.submit(parse_feed_bytes, content, resp_headers, parse_limit).result()
+                eps = [Episode(*r, podcast_name=pod['name']) for r in records]; stats.add('feed.parse', time.perf_counter() - t)
+            t = time.perf_counter()
+            try: self.store.upsert(feed_url, pod, eps)
+            except sqlite3.Error as e: logging.warning(f"Library update failed for {feed_url}: {e}")
+            self.feed_cache.put(feed_url, {'name': pod['name'], 'etag': resp.headers.get('ETag'), 'modified': resp.headers.get('Last-Modified'), 'limit': parse_limit, 'max_age': cache_max_age(resp.headers), 'episodes': eps})
+            stats.add('feed.store', time.perf_counter() - t)
             return eps
-        except: return []
+        except FetchCancelled: stats.count('feed.cancelled'); return None
+        except Exception as e:
+            logging.info(f"Feed fetch failed for {feed_url}: {e}"); stats.count('feed.failed')
+            return cached['episodes'] if cached else []
+        finally: stats.add('feed.total', time.perf_counter() - started)
+
+    def cached_episodes(self, pod, limit=100):
+        """Episodes already in memory for this podcast, without touching disk or network."""
+        entry = self.feed_cache.entries.get(pod.get('feed_url') or "")
+        return entry['episodes'][:limit] if entry else []
+
+    def read_feed(self, resp, pod, limit, cancel=None):
+        resp.raw.decode_content = True; tee = TeeReader(resp.raw, cancel)
+        try:
+            eps = parse_rss_stream(tee, pod['name'], limit)
+            if eps is not None: return eps
+        except ET.ParseError as e: logging.info(f"Streaming parse failed for {resp.url}, using feedparser: {e}")
+        import feedparser # Only needed for non-RSS or malformed feeds
+        feed = feedparser.parse(tee.rest(), response_headers={k.lower(): v for k, v in resp.headers.items()})
+        return feed_entries_to_episodes(feed, pod['name'], limit)
 
     def async_fetch_episodes(self, podcast, fetch_id):
         if podcast.get('type') == 'header' or fetch_id != self.current_fetch_id: return
         self.is_fetching_episodes = True; self.loading_status = "Loading..."
         
         if podcast.get('type') == 'global':
-            self.loading_status = "Refreshing all subscriptions..."
-            all_eps = []
-            threads = []
-            def worker(p): all_eps.extend(self.fetch_single_feed(p, limit=8))
-            for s in self.subscriptions:
-                t = threading.Thread(target=worker, args=(s,)); t.start(); threads.append(t)
-            for t in threads: t.join()
-            if fetch_id == self.current_fetch_id:
-                self.episodes = sorted(all_eps, key=lambda x: x['date'], reverse=True)
-                self.loading_status = ""
+            # NEW EPISODES is a query on the local library; only subscriptions the scheduler considers due go to the network
+            feed_urls = lambda: [s['feed_url'] for s in self.subscriptions if s.get('feed_url')]
+            if fetch_id == self.current_fetch_id: self.episodes = self.store.latest(feed_urls())
+            now = time.time(); due = [s for s in self.subscriptions if self.next_refresh_at(s) <= now]
+            total = len(due); done = 0
+            self.loading_status = f"Refreshing subscriptions (0/{total})..."; self.request_redraw()
+            pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+            stale = lambda: fetch_id != self.current_fetch_id
+            futures = [pool.submit(self.refresh_subscription, s, False, 8, stale) for s in due]
+            for fut in as_completed(futures):
+                if fetch_id != self.current_fetch_id: break
+                # Every finished feed is already in the library, so re-running the indexed query streams it into the pane
+                fut.result(); done += 1
+                self.episodes = self.store.latest(feed_urls())
+                self.loading_status = f"Refreshing subscriptions ({done}/{total})..."; self.request_redraw()
+            pool.shutdown(wait=False, cancel_futures=True)
+            if due: self.save_subscriptions(); self.save_refresh_state()
+            if fetch_id == self.current_fetch_id: self.loading_status = ""
         else:
             self.loading_status = "Fetching episodes..."
-            eps = self.fetch_single_feed(podcast, limit=100)
+            eps = self.fetch_single_feed(podcast, limit=100, cancel=lambda: fetch_id != self.current_fetch_id)
             if fetch_id == self.current_fetch_id:
                 self.episodes = eps
                 if self.episodes:
-                    latest = self.episodes[0]['date']
+                    latest = self.episodes[0].date
                     if podcast.get('latest_date') != latest:
                         podcast['latest_date'] = latest
-                        if any(s['name'] == podcast['name'] for s in self.subscriptions): self.save_subscriptions()
+                        if podcast['name'] in self.subscribed_names: self.save_subscriptions(); self.update_podcast_list(keep_selection=True)
                 self.loading_status = ""
         
         if fetch_id == self.current_fetch_id:
-            self.is_fetching_episodes = False
+            self.is_fetching_episodes = False; self.request_redraw()
+
+    def refresh_interval(self, url, entry):
+        checked = entry.get('checked', 0); known = self.refresh_intervals.get(url)
+        if known and known[0] == checked: return known[1]
+        stamps = sorted((e.published for e in entry.get('episodes', []) if e.published), reverse=True)
+        gaps = sorted(a - b for a, b in zip(stamps, stamps[1:]) if a > b)
+        cadence = gaps[len(gaps) // 2] if gaps else REFRESH_MAX * 4
+        interval = min(REFRESH_MAX, max(REFRESH_MIN, cadence / 4, entry.get('max_age') or 0))
+        self.refresh_intervals[url] = (checked, interval)
+        return interval
+
+    def next_refresh_at(self, sub):
+        key = sub.get('feed_url') or sub['name']
+        entry = self.feed_cache.get(sub['feed_url']) if sub.get('feed_url') else None
+        last = max(entry.get('checked', 0) if entry else 0, self.refresh_attempts.get(key, 0))
+        interval = self.refresh_interval(key, entry) if entry else REFRESH_MIN
+        return last + min(REFRESH_MAX, interval * 2 ** self.refresh_failures.get(key, 0))
+
+    def refresh_subscription(self, sub, save=True, limit=100, cancel=None):
+        """Fetch one subscription into the caches and library, recording the attempt for backoff.
+        Returns (episodes, whether the feed answered)."""
+        key = sub.get('feed_url') or sub['name']; previous = self.refresh_attempts.get(key)
+        started = self.refresh_attempts[key] = time.time()
+        eps = self.fetch_single_feed(sub, limit=limit, parse_pool=self.get_parse_pool(), cancel=cancel)
+        # fetch_single_feed falls back to the cache on errors; only a stored response (or a cache fresh enough
+        # to be served without asking) counts as an answer
+        entry = self.feed_cache.entries.get(sub.get('feed_url') or "")
+        ok = bool(entry and started - entry.get('checked', 0) < FEED_FRESH_SECONDS)
+        if not ok and cancel and cancel():
+            # Abandoned by the caller rather than failed: it neither counts nor pushes the next attempt back
+            if previous is None: self.refresh_attempts.pop(key, None)
+            else: self.refresh_attempts[key] = previous
+            return eps, False
+        if ok: self.refresh_failures.pop(key, None)
+        else: self.refresh_failures[key] = self.refresh_failures.get(key, 0) + 1
+        if save: self.save_refresh_state()
+        if eps and sub.get('latest_date') != eps[0].date:
+            sub['latest_date'] = eps[0].date
+            if save: self.save_subscriptions()
+            self.update_podcast_list(keep_selection=True) # Subscriptions are listed by latest episode
+        if AUTO_DOWNLOAD and sub['name'] in self.subscribed_names:
+            for e in eps[:AUTO_DOWNLOAD]: self.downloads.enqueue(e.url, auto=True)
+        return eps, ok
+
+    def refresh_scheduler(self):
+        """Keeps every subscription's cached episodes and latest_date current, one due feed at a time."""
+        while self.running:
+            subs = list(self.subscriptions)
+            due = min(subs, key=self.next_refresh_at, default=None)
+            wait = self.next_refresh_at(due) - time.time() if due else 60
+            if wait > 0: time.sleep(min(wait, 60)); continue
+            self.refresh_subscription(due); time.sleep(REFRESH_SPACING)
+
+    def select_podcast(self, pod, neighbours):
+        # Show whatever is cached now; the fetch itself waits for the cursor to rest
+        self.current_fetch_id += 1; self.selected_pod = pod; self.library_query = ("", [])
+        self.neighbourhood = {p.get('name') for p in [pod] + neighbours} # Prefetches outside it are cancelled
+        self.episodes = self.cached_episodes(pod) if pod.get('type') != 'global' else []
+        # Nothing to show yet: say it's loading through the debounce and the request, not "No episodes found."
+        self.is_fetching_episodes = not self.episodes; self.loading_status = "Loading..." if not self.episodes else ""
+        with self.selection_cond:
+            self.pending_selection = (pod, self.current_fetch_id, neighbours); self.selection_changed_at = time.time()
+            if not (self.selection_thread and self.selection_thread.is_alive()):
+                self.selection_thread = threading.Thread(target=self.selection_worker, daemon=True); self.selection_thread.start()
+            self.selection_cond.notify()
+
+    def selection_worker(self):
+        """Runs selection fetches one at a time. Only the selection the cursor settles on is fetched; moving on
+        bumps current_fetch_id, which cancels its download. Neighbour prefetches keep running while the cursor
+        stays near them, so landing on one joins its fetch instead of starting over."""
+        while self.running:
+            with self.selection_cond:
+                while not self.pending_selection: self.selection_cond.wait()
+                while (remaining := self.selection_changed_at + SELECT_DEBOUNCE - time.time()) > 0: self.selection_cond.wait(remaining)
+                pod, fetch_id, neighbours = self.pending_selection; self.pending_selection = None
+            # One failed selection (a locked library, a parser bug) must not stop every later one from loading
+            try:
+                self.async_fetch_episodes(pod, fetch_id)
+                if fetch_id == self.current_fetch_id:
+                    for n in neighbours:
+                        gone = lambda n=n: n.get('name') not in self.neighbourhood
+                        self.prefetch_pool.submit(lambda n=n, gone=gone: gone() or self.fetch_single_feed(n, 100, cancel=gone, prefetch=True))
+            except Exception as e:
+                logging.warning(f"Loading {pod.get('name')} failed: {e}")
+                if fetch_id == self.current_fetch_id:
+                    self.is_fetching_episodes = False; self.loading_status = ""; self.set_error(f"Could not load {pod.get('name')}")
 
     def render_big_text(self, text, color=POD_BLUE, max_width=None):
         raw_text = unicodedata.normalize('NFC', text).upper()
@@ -259,39 +1243,75 @@ class PodcastPlayer:
         m, s = divmod(int(seconds), 60); h, m = divmod(m, 60)
         return f"{h:02d}:{m:02d}:{s:02d}" if h > 0 else f"{m:02d}:{s:02d}"
 
-    def send_mpv_command(self, cmd_list):
-        try:
-            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM); sock.settimeout(0.05); sock.connect(MPV_SOCKET_PATH)
-            cmd = json.dumps({"command": cmd_list}) + "\n"; sock.send(cmd.encode()); sock.close()
-        except: pass
+    def send_mpv_command(self, cmd_list, wait=False):
+        return self.mpv.command(cmd_list, wait=wait)
 
     def get_mpv_property(self, prop):
+        if prop in MpvClient.OBSERVED: return self.mpv.get(prop)
+        reply = self.mpv.command(["get_property", prop], wait=True)
+        return reply.get('data') if reply else None
+
+    def ensure_mpv(self):
+        if self.mpv_process and self.mpv_process.poll() is None: return True
+        self.mpv.close(); self.queued_episode = None
+        if os.path.exists(MPV_SOCKET_PATH):
+            try: os.remove(MPV_SOCKET_PATH)
+            except: pass
         try:
-            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM); sock.settimeout(0.1); sock.connect(MPV_SOCKET_PATH)
-            cmd = json.dumps({"command": ["get_property", prop]}) + "\n"; sock.send(cmd.encode())
-            data = json.loads(sock.recv(4096).decode()); sock.close()
-            if 'data' in data: return data['data']
-        except: pass
-        return None
+            if not self.mpv_log: self.mpv_log = open(MPV_LOG, "a")
+            self.mpv_process = subprocess.Popen(MPV_CMD, stdout=self.mpv_log, stderr=self.mpv_log)
+        except Exception as e: self.set_error(f"MPV Error: {str(e)}"); return False
+        deadline = time.time() + 3
+        while time.time() < deadline and not self.mpv.connect(): time.sleep(0.05)
+        if not self.mpv.sock: self.set_error("MPV Error: IPC socket did not come up."); return False
+        return True
+
+    def load_episode(self, ep, flags):
+        # A downloaded copy seeks and resumes without touching the network; history stays keyed by the remote URL
+        source = self.downloads.local_path(ep.url) or ep.url
+        cmd = {"name": "loadfile", "url": source, "flags": flags}
+        start_pos = self.history.get(ep.url)
+        if start_pos > 10: cmd["options"] = f"start={int(start_pos)}" # Only resume if more than 10s in
+        self.send_mpv_command(cmd)
+        return source
+
+    def queue_next(self):
+        # Keep exactly one follow-up entry in mpv's playlist so it can be prefetched
+        self.send_mpv_command(["playlist-clear"]); self.queued_episode = None
+        urls = [e.url for e in self.play_list]
+        if self.playing_episode and self.playing_episode.url in urls:
+            idx = urls.index(self.playing_episode.url)
+            if idx + 1 < len(self.play_list):
+                self.queued_episode = self.play_list[idx + 1]; self.queued_source = self.load_episode(self.queued_episode, "append")
+
+    def sync_playing_episode(self):
+        # mpv moved on to the queued episode by itself
+        if self.queued_episode and self.mpv.get('path') == self.queued_source:
+            self.playing_episode = self.queued_episode; self.queue_next()
 
     def play_episode(self, ep):
-        if not ep or not ep.get('url'): self.set_error("Error: No URL found."); return
-        self.playing_episode = ep; self.set_error("")
+        if not ep or not ep.url: self.set_error("Error: No URL found."); return
+        self.playing_episode = ep; self.set_error(""); self.play_list = list(self.episodes)
+        if not self.ensure_mpv(): return
+        start_pos = self.history.get(ep.url)
+        if start_pos > 10: self.set_error(f"Resuming from {self.format_time(start_pos)}...")
+        if self.queued_episode and self.queued_episode.url == ep.url: self.send_mpv_command(["playlist-next", "force"])
+        else: self.load_episode(ep, "replace")
+        self.queue_next()
+
+    def download_episode(self, ep):
+        if not ep or not ep.url: return
+        status = self.downloads.status(ep.url)
+        if status == 'done': self.set_error("Already downloaded.")
+        elif status == 'active': self.set_error(f"Downloading... {int(self.downloads.active.get(ep.url, 0) * 100)}%")
+        else: self.downloads.enqueue(ep.url); self.set_error(f"Downloading '{ep.title}'...")
+
+    def stop_mpv(self):
+        self.send_mpv_command(["quit"]); self.mpv.close()
         if self.mpv_process:
-            try: self.mpv_process.terminate()
-            except: pass
-        
-        start_pos = self.playback_history.get(ep['url'], 0)
-        cmd = ["mpv", "--no-video", "--no-terminal", f"--input-ipc-server={MPV_SOCKET_PATH}", "--user-agent=Mozilla/5.0", "--demuxer-max-bytes=50M", "--network-timeout=30", "--ytdl=no"]
-        if start_pos > 10: # Only resume if more than 10s in
-            cmd.append(f"--start={int(start_pos)}")
-            self.set_error(f"Resuming from {self.format_time(start_pos)}...")
-        cmd.append(ep['url'])
-        
-        try:
-            log_f = open(MPV_LOG, "a")
-            self.mpv_process = subprocess.Popen(cmd, stdout=log_f, stderr=log_f)
-        except Exception as e: self.set_error(f"MPV Error: {str(e)}")
+            try: self.mpv_process.wait(timeout=1)
+            except: self.mpv_process.terminate()
+        if self.mpv_log: self.mpv_log.close(); self.mpv_log = None
 
     def toggle_subscription(self):
         pod = self.podcasts[self.selected_podcast_index]
@@ -304,15 +1324,42 @@ class PodcastPlayer:
             self.subscriptions.append(sub_pod)
         self.save_subscriptions(); self.update_podcast_list()
 
+    def render_stats(self):
+        summary = self.stats.summary()
+        table = Table(box=None, expand=True, header_style=GRAY_TEXT)
+        table.add_column("ms", ratio=1, no_wrap=True, overflow="ellipsis")
+        for col in ("n", "p50", "p90", "p99", "max"): table.add_column(col, justify="right", no_wrap=True)
+        for name, s in summary['timings'].items():
+            table.add_row(name, str(s['count']), f"{s['p50_ms']:.1f}", f"{s['p90_ms']:.1f}", f"{s['p99_ms']:.1f}", f"{s['max_ms']:.1f}")
+        table.add_row("")
+        for name, n in summary['counters'].items(): table.add_row(name, str(n))
+        threads = summary['threads']; table.add_row(Text(f"threads ({sum(threads.values())})", style=f"bold {LIGHT_TEXT}"))
+        for name, n in sorted(threads.items(), key=lambda kv: -kv[1]): table.add_row(name, str(n))
+        return Panel(Padding(table, (1, 1)), title="Stats", border_style=GRAY_TEXT)
+
     def create_layout(self):
         layout = Layout(); layout.split_column(Layout(name="header", size=3), Layout(name="main"), Layout(name="footer", size=1))
-        layout["main"].split_row(Layout(name="podcasts", ratio=10), Layout(name="episodes", ratio=12), Layout(name="now_playing", ratio=20))
+        layout["main"].split_row(Layout(name="podcasts", ratio=10), Layout(name="episodes", ratio=12), Layout(name="now_playing", ratio=20), Layout(name="stats", ratio=18, visible=False))
         return layout
 
+    def request_redraw(self):
+        self.redraw.set()
+
+    def pane_changed(self, name, key):
+        # Keys hold the pane's inputs; lists and dicts compare by identity first, so unchanged state is cheap to detect
+        old = self.pane_keys.get(name)
+        if old is not None and len(old) == len(key) and all(a is b or a == b for a, b in zip(old, key)): return False
+        self.pane_keys[name] = key; return True
+
     def update_layout(self, layout):
+        """Refresh only the panes whose inputs changed since the last call. Returns True if anything was rebuilt."""
+        if layout is not self.rendered_layout: self.rendered_layout = layout; self.pane_keys = {}
         if self.error_message and time.time() - self.error_time > 5: self.error_message = ""
-        header_text = Text.assemble(("POD-TUI", f"bold {POD_BLUE}"), (" - Podcast Explorer ", LIGHT_TEXT), (f"[{datetime.now().strftime('%H:%M:%S')}]", GRAY_TEXT))
-        layout["header"].update(Panel(Align.center(header_text, vertical="middle"), border_style=POD_BLUE))
+        changed = False
+        clock = datetime.now().strftime('%H:%M:%S')
+        if self.pane_changed('header', (clock,)):
+            header_text = Text.assemble(("POD-TUI", f"bold {POD_BLUE}"), (" - Podcast Explorer ", LIGHT_TEXT), (f"[{clock}]", GRAY_TEXT))
+            layout["header"].update(Panel(Align.center(header_text, vertical="middle"), border_style=POD_BLUE)); changed = True
         
         visible_pods = self.get_visible_podcasts()
         self.selected_podcast_index = max(0, min(self.selected_podcast_index, len(visible_pods)-1)) if visible_pods else 0
@@ -325,65 +1372,62 @@ class PodcastPlayer:
             if visible_pods:
                 pod = visible_pods[self.selected_podcast_index]
                 if pod.get('type') != 'header':
-                    self.current_fetch_id += 1
-                    threading.Thread(target=self.async_fetch_episodes, args=(pod, self.current_fetch_id), daemon=True).start()
+                    i = self.selected_podcast_index
+                    near = [visible_pods[j] for d in range(1, PREFETCH_NEIGHBOURS + 1) for j in (i + d, i - d) if 0 <= j < len(visible_pods)]
+                    self.select_podcast(pod, [p for p in near if p.get('type') not in ['header', 'global']])
         h = self.console.size.height - 8
-        p_table = Table(show_header=False, box=None, expand=True); p_table.add_column("N")
-        p_start = max(0, self.selected_podcast_index - h // 2)
-        
-        for i, p in enumerate(visible_pods[p_start:p_start+h]):
-            if p.get('type') == 'header':
-                p_table.add_row(Text(f"\n{p['name']}", style=GRAY_TEXT))
-                continue
-            marker = "  "
-            if p.get('type') == 'global': marker = ""
-            elif any(s['name'] == p['name'] for s in self.subscriptions): marker = "★ "
-            style = f"bold {POD_BLUE}" if (p_start+i == self.selected_podcast_index and self.active_pane == 'podcasts') else ""
-            p_table.add_row(Text(f"{marker}{p['name']}", style=style))
-        
-        if self.search_mode and self.search_buffer and not [p for p in visible_pods if p.get('type') not in ['header', 'global']]:
-            p_table.add_row(Text("\n[Enter] to search iTunes", style=GRAY_TEXT))
+        filter_q = self.search_buffer if self.search_mode else ""
+        if self.pane_changed('podcasts', (visible_pods, len(self.subscriptions), self.selected_podcast_index, self.active_pane, h, filter_q)):
+            p_table = Table(show_header=False, box=None, expand=True); p_table.add_column("N")
+            p_start = max(0, self.selected_podcast_index - h // 2)
+            
+            for i, p in enumerate(visible_pods[p_start:p_start+h]):
+                if p.get('type') == 'header':
+                    p_table.add_row(Text(f"\n{p['name']}", style=GRAY_TEXT))
+                    continue
+                marker = "  "
+                if p.get('type') == 'global': marker = ""
+                elif p['name'] in self.subscribed_names: marker = "★ "
+                style = f"bold {POD_BLUE}" if (p_start+i == self.selected_podcast_index and self.active_pane == 'podcasts') else ""
+                p_table.add_row(Text(f"{marker}{p['name']}", style=style))
             
-        layout["podcasts"].update(Panel(Padding(p_table, (1, 2)), title="Podcasts", border_style=POD_BLUE if self.active_pane == 'podcasts' else GRAY_TEXT))
+            if filter_q and not [p for p in visible_pods if p.get('type') not in ['header', 'global']]:
+                p_table.add_row(Text("\n[Enter] to search iTunes", style=GRAY_TEXT))
+                
+            layout["podcasts"].update(Panel(Padding(p_table, (1, 2)), title="Podcasts", border_style=POD_BLUE if self.active_pane == 'podcasts' else GRAY_TEXT)); changed = True
         
-        e_table = Table(show_header=False, box=None, expand=True); e_table.add_column("T")
         visible_eps = self.get_visible_episodes()
         self.selected_episode_index = max(0, min(self.selected_episode_index, len(visible_eps)-1)) if visible_eps else 0
+        cur_pod = self.podcasts[self.selected_podcast_index] if self.podcasts else {}
+        playing_url = self.playing_episode.url if self.playing_episode else None
+        e_key = (visible_eps, self.selected_episode_index, self.active_pane, h, filter_q, self.is_fetching_episodes, self.loading_status, playing_url, cur_pod.get('type'), self.downloads.version)
+        if self.pane_changed('episodes', e_key):
+            e_table = Table(show_header=False, box=None, expand=True); e_table.add_column("T")
+            if self.is_fetching_episodes and not visible_eps: e_table.add_row(Text(f"  {self.loading_status}", style=GRAY_TEXT))
+            elif not visible_eps: e_table.add_row(Text("  No episodes found.", style=GRAY_TEXT))
+            else:
+                e_start = max(0, self.selected_episode_index - h // 2)
+                for i, e in enumerate(visible_eps[e_start:e_start+h]):
+                    is_sel = (e_start+i == self.selected_episode_index and self.active_pane == 'episodes'); prefix = "▶ " if e.url == playing_url else DOWNLOAD_MARKS.get(self.downloads.status(e.url), "  ")
+                    title_line = f"{prefix}{e.date} - {e.title}"
+                    if cur_pod.get('type') == 'global': title_line = f"{prefix}{e.date} - [{e.podcast_name}] {e.title}"
+                    e_table.add_row(Text(title_line, style=f"bold {POD_BLUE}" if is_sel else "", overflow="ellipsis"))
+            
+            if filter_q and not visible_eps:
+                 e_table.add_row(Text("\n[Enter] to search iTunes", style=GRAY_TEXT))
+                 
+            e_status = Text(self.loading_status, style=GRAY_TEXT) if self.is_fetching_episodes and visible_eps else None
+            layout["episodes"].update(Panel(Padding(e_table, (1, 2)), title="Episodes", subtitle=e_status, border_style=POD_BLUE if self.active_pane == 'episodes' else GRAY_TEXT)); changed = True
         
-        if self.is_fetching_episodes: e_table.add_row(Text(f"  {self.loading_status}", style=GRAY_TEXT))
-        elif not visible_eps: e_table.add_row(Text("  No episodes found.", style=GRAY_TEXT))
-        else:
-            e_start = max(0, self.selected_episode_index - h // 2)
-            cur_pod = self.podcasts[self.selected_podcast_index] if self.podcasts else {}
-            for i, e in enumerate(visible_eps[e_start:e_start+h]):
-                is_sel = (e_start+i == self.selected_episode_index and self.active_pane == 'episodes'); prefix = "▶ " if (self.playing_episode and e['url'] == self.playing_episode['url']) else "  "
-                title_line = f"{prefix}{e['date']} - {e['title']}"
-                if cur_pod.get('type') == 'global': title_line = f"{prefix}{e['date']} - [{e['podcast_name']}] {e['title']}"
-                e_table.add_row(Text(title_line, style=f"bold {POD_BLUE}" if is_sel else "", overflow="ellipsis"))
-        
-        if self.search_mode and self.search_buffer and not visible_eps:
-             e_table.add_row(Text("\n[Enter] to search iTunes", style=GRAY_TEXT))
-             
-        layout["episodes"].update(Panel(Padding(e_table, (1, 2)), title="Episodes", border_style=POD_BLUE if self.active_pane == 'episodes' else GRAY_TEXT))
-        
-        inner = []; pane_w = self.console.size.width * 2 // 4; target_ep = self.playing_episode; is_playing_cur = False
+        pane_w = self.console.size.width * 2 // 4; target_ep = self.playing_episode; is_playing_cur = False; info_pod = None
         if not target_ep:
             if self.active_pane in ['episodes', 'now_playing'] and self.episodes: target_ep = self.episodes[self.selected_episode_index]
-            elif self.active_pane == 'podcasts' and self.podcasts: 
-                p = self.podcasts[self.selected_podcast_index]
-                if p.get('type') not in ['header', 'global']:
-                    bt = self.render_big_text(p['name'], max_width=pane_w)
-                    if bt: inner.append(bt); inner.append(Text("\n"))
-                    inner.append(Text(p['name'], style=f"bold {LIGHT_TEXT} underline")); inner.append(Text(p['artist'] + "\n\n" + (p.get('full_description') or p.get('description','')), style=LIGHT_TEXT))
-                elif p.get('type') == 'global':
-                    inner.append(self.render_big_text("NEW EPISODES", max_width=pane_w))
-                    inner.append(Text("Latest episodes from your subscriptions.", style=LIGHT_TEXT))
-        else: is_playing_cur = True
+            elif self.active_pane == 'podcasts' and self.podcasts: info_pod = self.podcasts[self.selected_podcast_index]
+        else:
+            is_playing_cur = True; self.sync_playing_episode(); target_ep = self.playing_episode
         
-        if target_ep and 'title' in target_ep:
-            bt = self.render_big_text(target_ep['title'], max_width=pane_w)
-            if bt: inner.append(bt); inner.append(Text("\n"))
-            inner.append(Text(target_ep['title'], style=f"bold {LIGHT_TEXT} underline")); inner.append(Text(f"{target_ep.get('date','')} [{target_ep.get('duration','')}]", style=GRAY_TEXT)); inner.append(Text(""))
+        pos = dur = 0.0; status = "○ READY"
+        if target_ep:
             pos = self.get_mpv_property("time-pos") or (self.current_position if is_playing_cur else 0.0)
             dur = self.get_mpv_property("duration") or (self.total_duration if is_playing_cur else 0.0)
             if is_playing_cur:
@@ -392,31 +1436,53 @@ class PodcastPlayer:
                  # Save history periodically
                  if time.time() - self.last_save_time > 5:
                      if pos > 0:
-                         self.playback_history[target_ep['url']] = pos
-                         self.save_history()
+                         self.history.record(target_ep.url, pos)
                      self.last_save_time = time.time()
-            else: status = "○ READY"
-            bar_len = 30
-            if dur and dur > 0:
-                 perc = min(1.0, max(0.0, pos / dur)); filled = int(perc * bar_len); bar = "━" * filled + "─" * (bar_len - filled); time_str = f"{self.format_time(pos)} / {self.format_time(dur)}"
-                 inner.append(Text.assemble((bar, POD_BLUE), (f" {time_str}", GRAY_TEXT)))
-            else: inner.append(Text(f"{'─' * bar_len} 00:00 / --:--", style=GRAY_TEXT))
-            if self.error_message: inner.append(Text(f"\n{self.error_message}", style=ERROR_RED))
-            else: inner.append(Text(f"\n{status}", style=f"bold {POD_BLUE}"))
+        
+        info_key = (info_pod, info_pod.get('full_description') if info_pod else None, target_ep, int(pos), int(dur or 0), status, self.error_message, self.active_pane, tuple(self.console.size))
+        if self.pane_changed('now_playing', info_key):
+            inner = []
+            if info_pod and info_pod.get('type') not in ['header', 'global']:
+                bt = self.render_big_text(info_pod['name'], max_width=pane_w)
+                if bt: inner.append(bt); inner.append(Text("\n"))
+                inner.append(Text(info_pod['name'], style=f"bold {LIGHT_TEXT} underline")); inner.append(Text(info_pod['artist'] + "\n\n" + (info_pod.get('full_description') or info_pod.get('description','')), style=LIGHT_TEXT))
+            elif info_pod and info_pod.get('type') == 'global':
+                inner.append(self.render_big_text("NEW EPISODES", max_width=pane_w))
+                inner.append(Text("Latest episodes from your subscriptions.", style=LIGHT_TEXT))
             
-            # Dynamic Truncation based on window area
-            area = self.console.size.width * self.console.size.height
-            limit = max(200, area // 10)
-            desc = target_ep.get('description','')
-            if len(desc) > limit: desc = desc[:limit] + "..."
-            inner.append(Text("\n" + desc, style=LIGHT_TEXT))
+            if target_ep:
+                bt = self.render_big_text(target_ep.title, max_width=pane_w)
+                if bt: inner.append(bt); inner.append(Text("\n"))
+                inner.append(Text(target_ep.title, style=f"bold {LIGHT_TEXT} underline")); inner.append(Text(f"{target_ep.date} [{target_ep.duration}]", style=GRAY_TEXT)); inner.append(Text(""))
+                bar_len = 30
+                if dur and dur > 0:
+                     perc = min(1.0, max(0.0, pos / dur)); filled = int(perc * bar_len); bar = "━" * filled + "─" * (bar_len - filled); time_str = f"{self.format_time(pos)} / {self.format_time(dur)}"
+                     inner.append(Text.assemble((bar, POD_BLUE), (f" {time_str}", GRAY_TEXT)))
+                else: inner.append(Text(f"{'─' * bar_len} 00:00 / --:--", style=GRAY_TEXT))
+                if self.error_message: inner.append(Text(f"\n{self.error_message}", style=ERROR_RED))
+                else: inner.append(Text(f"\n{status}", style=f"bold {POD_BLUE}"))
+                
+                # Dynamic Truncation based on window area
+                area = self.console.size.width * self.console.size.height
+                limit = max(200, area // 10)
+                if target_ep.summary is None: target_ep.summary = self.store.summary(target_ep.url) # Library row, first time on screen
+                desc = target_ep.description
+                if len(desc) > limit: desc = desc[:limit] + "..."
+                inner.append(Text("\n" + desc, style=LIGHT_TEXT))
+            
+            layout["now_playing"].update(Panel(Padding(Align.center(Text("\n").join(inner), vertical="middle"), (1, 3)), title="Info / Now Playing", border_style=POD_BLUE if self.active_pane == 'now_playing' else GRAY_TEXT)); changed = True
         
-        layout["now_playing"].update(Panel(Padding(Align.center(Text("\n").join(inner), vertical="middle"), (1, 3)), title="Info / Now Playing", border_style=POD_BLUE if self.active_pane == 'now_playing' else GRAY_TEXT))
-        footer = Text("↑/↓: Nav | Ent: Play | /: Filter | s: Sub | Tab: Pane | q: Quit", style=GRAY_TEXT)
-        if self.search_mode:
-            context = "Filter / Search iTunes: "
-            footer = Text.assemble((context, GRAY_TEXT), (self.search_buffer, LIGHT_TEXT), ("█", POD_BLUE))
-        layout["footer"].update(Align.center(footer))
+        if layout["stats"].visible != self.show_stats: layout["stats"].visible = self.show_stats; changed = True
+        if self.show_stats and self.pane_changed('stats', (int(time.time()), tuple(self.console.size))):
+            layout["stats"].update(self.render_stats()); changed = True
+
+        if self.pane_changed('footer', (self.search_mode, self.search_buffer)):
+            footer = Text("↑/↓: Nav | Ent: Play | /: Filter | s: Sub | d: Download | p: Stats | Tab: Pane | q: Quit", style=GRAY_TEXT)
+            if self.search_mode:
+                context = "Filter / Search iTunes: "
+                footer = Text.assemble((context, GRAY_TEXT), (self.search_buffer, LIGHT_TEXT), ("█", POD_BLUE))
+            layout["footer"].update(Align.center(footer)); changed = True
+        return changed
 
     def handle_input(self):
         fd = sys.stdin.fileno(); old = termios.tcgetattr(fd)
@@ -429,54 +1495,37 @@ class PodcastPlayer:
                         if char in ['\r', '\n']:
                             self.search_mode = False; q = self.search_buffer; self.search_buffer = ""
                             if not q.strip():
-                                self.fetch_discovery(); self.update_podcast_list(); continue
+                                self.restore_discovery(); self.update_podcast_list(); continue
                                 
                             if q.startswith('http') and self.active_pane == 'podcasts':
                                 pod = {'name': 'Custom Feed', 'artist': 'RSS', 'feed_url': q, 'itunes_id': None, 'description': 'Custom RSS Feed'}
                                 self.subscriptions.append(pod); self.save_subscriptions()
                                 self.update_podcast_list(); self.active_pane = 'podcasts'; self.selected_podcast_index = 0
                             else:
-                                try:
-                                    self.set_error(f"Searching iTunes for '{q}'...")
-                                    entity = "podcast" if self.active_pane == 'podcasts' else "podcastEpisode"
-                                    resp = requests.get(f"https://itunes.apple.com/search?term={requests.utils.quote(q)}&entity={entity}&limit=50").json()
-                                    results = resp.get('results', [])
-                                    if results:
-                                        if self.active_pane == 'podcasts':
-                                            self.is_showing_search = True
-                                            self.discovery = [{'name': r.get('collectionName', 'Unknown'), 'artist': r.get('artistName', 'Unknown'), 'itunes_id': r.get('collectionId'), 'feed_url': r.get('feedUrl', ''), 'description': r.get('primaryGenreName', 'Podcast')} for r in results]
-                                            self.update_podcast_list()
-                                            for idx, p in enumerate(self.podcasts):
-                                                if p.get('type') == 'header' and 'DISCOVERY' in p.get('name', ''):
-                                                    self.selected_podcast_index = idx + 1; break
-                                        else:
-                                            self.episodes = []
-                                            for r in results:
-                                                date_str = r.get('releaseDate', '')[:16].replace('T', ' ')
-                                                self.episodes.append({'title': r.get('trackName', 'Unknown'), 'description': r.get('description', ''), 'url': r.get('episodeUrl', ''), 'date': date_str, 'duration': str(r.get('trackTimeMillis', 0) // 1000), 'podcast_name': r.get('collectionName', 'Unknown')})
-                                            self.selected_episode_index = 0
-                                        self.set_error("")
-                                    else:
-                                        self.set_error("No results found.")
-                                except Exception as e: 
-                                    self.set_error(f"Search error: {str(e)}")
+                                self.search_generation += 1
+                                if self.search_timer: self.search_timer.cancel()
+                                threading.Thread(target=self.run_search, args=(q, self.search_entity(), self.search_generation), daemon=True).start()
                         elif char == '\x1b':
                             if select.select([sys.stdin], [], [], 0.01)[0]:
                                 sys.stdin.read(2)
                             else:
-                                if self.is_showing_search: self.fetch_discovery()
-                                self.search_mode = False; self.search_buffer = ""; self.update_podcast_list()
-                        elif ord(char) in [8, 127]: self.search_buffer = self.search_buffer[:-1]
-                        else: self.search_buffer += char
+                                if self.is_showing_search: self.restore_discovery()
+                                self.search_mode = False; self.search_buffer = ""; self.search_generation += 1; self.update_podcast_list()
+                        elif ord(char) in [8, 127]: self.search_buffer = self.search_buffer[:-1]; self.schedule_search()
+                        else: self.search_buffer += char; self.schedule_search()
                     else:
                         if char == 'q': self.running = False
                         elif char == '/':
                              self.search_mode = True; self.search_buffer = ""
                         elif char == 's': self.toggle_subscription()
+                        elif char == 'p': self.show_stats = not self.show_stats
+                        elif char == 'd' and self.active_pane == 'episodes':
+                            visible_eps = self.get_visible_episodes()
+                            if visible_eps: self.download_episode(visible_eps[min(self.selected_episode_index, len(visible_eps) - 1)])
                         elif ord(char) == 9: # Tab cycle
                              cycle = ['podcasts', 'episodes', 'now_playing']
                              self.active_pane = cycle[(cycle.index(self.active_pane) + 1) % len(cycle)]
-                             if self.search_mode: self.search_buffer = ""; self.search_mode = False # Reset on tab
+                             if self.search_mode: self.search_buffer = ""; self.search_mode = False; self.search_generation += 1 # Reset on tab
                         elif char == 'h': self.active_pane = 'podcasts'
                         elif char == 'l': self.active_pane = 'episodes'
                         elif char == ' ': self.send_mpv_command(["cycle", "pause"])
@@ -510,16 +1559,122 @@ class PodcastPlayer:
                                     elif self.active_pane == 'podcasts': self.active_pane = 'episodes'
                             else:
                                 # Standalone ESC resets search/discovery
-                                if self.is_showing_search: self.fetch_discovery()
-                                self.search_mode = False; self.search_buffer = ""; self.update_podcast_list()
+                                if self.is_showing_search: self.restore_discovery()
+                                self.search_mode = False; self.search_buffer = ""; self.search_generation += 1; self.update_podcast_list()
+                    self.request_redraw()
         finally: termios.tcsetattr(fd, termios.TCSADRAIN, old)
 
     def run(self):
         threading.Thread(target=self.handle_input, daemon=True).start()
-        with Live(self.create_layout(), refresh_per_second=4, screen=True) as live:
-            while self.running:
-                layout = self.create_layout(); self.update_layout(layout); live.update(layout); time.sleep(0.1)
-        if self.mpv_process: self.mpv_process.terminate()
+        threading.Thread(target=self.refresh_scheduler, daemon=True).start()
+        signal.signal(signal.SIGWINCH, lambda *_: self.request_redraw())
+        try:
+            layout = self.create_layout(); self.update_layout(layout)
+            # Frames are pushed only when a pane changed; input, fetches and mpv events wake the loop early
+            with Live(layout, auto_refresh=False, screen=True) as live:
+                live.refresh()
+                ttff = time.perf_counter() - STARTED_AT
+                (logging.warning if ttff > TTFF_TARGET else logging.info)(f"Time to first frame: {ttff * 1000:.0f} ms (target {TTFF_TARGET * 1000:.0f} ms)")
+                while self.running:
+                    self.redraw.wait(CLOCK_TICK - time.time() % CLOCK_TICK); self.redraw.clear()
+                    t = time.perf_counter()
+                    if self.update_layout(layout):
+                        t2 = time.perf_counter(); live.refresh()
+                        self.stats.add('frame.build', t2 - t); self.stats.add('frame.paint', time.perf_counter() - t2)
+                    else: self.stats.add('frame.idle', time.perf_counter() - t)
+                    time.sleep(FRAME_INTERVAL)
+        finally: # Also on a crash in the loop: never leave an idle mpv or a half-written journal behind
+            self.running = False
+            self.stop_mpv(); self.history.close(); self.downloads.close(); self.stats.dump()
+            if self.parse_pool: self.parse_pool.shutdown(wait=False, cancel_futures=True)
+
+def emit(record):
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n"); sys.stdout.flush()
+
+def episode_record(ep):
+    return {'podcast': ep.podcast_name, 'title': ep.title, 'date': ep.date, 'published': ep.published, 'duration': ep.duration, 'url': ep.url}
+
+def refresh_feeds(player, subs, workers):
+    """Refresh `subs` through the scheduler's fetch path, many feeds at once. Yields one record per feed as it finishes."""
+    player.resolve_podcasts(subs) # One batched iTunes lookup for everything without a feed URL yet
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        started = {pool.submit(player.refresh_subscription, s, False): (s, time.time()) for s in subs}
+        for fut in as_completed(started):
+            sub, t0 = started[fut]
+            try: eps, ok = fut.result()
+            except Exception as e: eps, ok = [], False; logging.warning(f"Refresh failed for {sub.get('name')}: {e}")
+            yield {'podcast': sub.get('name'), 'feed_url': sub.get('feed_url'), 'ok': ok, 'episodes': len(eps),
+                   'latest': eps[0].date if eps else sub.get('latest_date'), 'seconds': round(time.time() - t0, 3)}
+    player.save_subscriptions(); player.save_refresh_state()
+
+def cli_refresh(player, args):
+    subs = list(player.subscriptions)
+    if args.due: now = time.time(); subs = [s for s in subs if player.next_refresh_at(s) <= now]
+    failed = 0
+    for record in refresh_feeds(player, subs, args.workers):
+        failed += not record['ok']; emit(record)
+    return 1 if failed and failed == len(subs) else 0
+
+def cli_new(player, args):
+    if not args.offline:
+        # The same rule NEW EPISODES uses: only due feeds go to the network, with the same backoff for failing ones
+        now = time.time(); due = [s for s in player.subscriptions if player.next_refresh_at(s) <= now]
+        for _ in refresh_feeds(player, due, args.workers): pass
+    eps = player.store.latest([s['feed_url'] for s in player.subscriptions if s.get('feed_url')], args.limit)
+    for ep in eps:
+        if args.json: emit(episode_record(ep))
+        else: print(f"{ep.date}  [{ep.podcast_name}] {ep.title}")
+    return 0
+
+def cli_import_opml(player, args):
+    try: root = ET.parse(args.file).getroot()
+    except (OSError, ET.ParseError) as e: print(f"pod-tui: cannot read {args.file}: {e}", file=sys.stderr); return 1
+    known = {s.get('feed_url') for s in player.subscriptions} | player.subscribed_names; added = []
+    for outline in root.iter('outline'):
+        url = (outline.get('xmlUrl') or "").strip(); name = (outline.get('title') or outline.get('text') or url).strip()
+        if not url or url in known or name in known: continue
+        known.update((url, name))
+        added.append({'name': name, 'artist': 'RSS', 'feed_url': url, 'itunes_id': None, 'description': outline.get('description') or 'Imported from OPML'})
+    player.subscriptions.extend(added); player.save_subscriptions(); player.update_podcast_list()
+    if args.no_refresh:
+        for sub in added: emit({'podcast': sub['name'], 'feed_url': sub['feed_url'], 'imported': True})
+    else:
+        for record in refresh_feeds(player, added, args.workers): emit(dict(record, imported=True))
+    return 0
+
+def main(argv):
+    """Headless commands for cron and scripts; every feed result is printed as one JSON line as soon as it is in."""
+    import argparse
+    parser = argparse.ArgumentParser(prog="pod-tui", description="Run without a command for the interactive player.")
+    parser.add_argument("--profile", metavar="FILE", help="write cProfile data for the main thread to FILE, read it with `python -m pstats`")
+    commands = parser.add_subparsers(dest="command")
+    refresh = commands.add_parser("refresh", help="fetch every subscription into the caches and library")
+    refresh.add_argument("--due", action="store_true", help="only feeds the background scheduler would fetch now")
+    new = commands.add_parser("new", help="list the newest episodes across subscriptions")
+    new.add_argument("--json", action="store_true", help="one JSON object per line")
+    new.add_argument("--limit", type=int, default=50)
+    new.add_argument("--offline", action="store_true", help="only read the library, don't fetch due feeds first")
+    opml = commands.add_parser("import-opml", help="subscribe to every feed in an OPML file")
+    opml.add_argument("file")
+    opml.add_argument("--no-refresh", action="store_true", help="don't fetch the imported feeds")
+    for command in (refresh, new, opml): command.add_argument("--workers", type=int, default=CLI_FETCH_WORKERS, help="feeds fetched at once")
+    args = parser.parse_args(argv)
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile(); profiler.enable()
+    try:
+        if not args.command:
+            if sys.stdin.isatty(): PodcastPlayer().run()
+            return 0
+        player = PodcastPlayer(interactive=False)
+        try: return {"refresh": cli_refresh, "new": cli_new, "import-opml": cli_import_opml}[args.command](player, args)
+        finally:
+            player.downloads.pool.shutdown(wait=True) # Let auto-downloads from a cron refresh finish
+            if player.parse_pool: player.parse_pool.shutdown()
+            player.stats.dump()
+    finally:
+        if args.profile: profiler.disable(); profiler.dump_stats(args.profile); logging.info(f"Profile written to {args.profile}")
 
 if __name__ == "__main__": 
+    if len(sys.argv) > 1: sys.exit(main(sys.argv[1:]))
     if sys.stdin.isatty(): PodcastPlayer().run()